@@ -0,0 +1,83 @@
+"""
+Планы выполнения горячих запросов списков и проверок владельца.
+
+Запуск против копии боевой базы (нужен DATABASE_URL на PostgreSQL):
+
+    python -m benchmarks.explain_listing_plans > bench_output.txt
+
+Снимите вывод до и после `alembic upgrade head` (ревизия 9afb21af26a7) и
+сравните: Seq Scan + Sort должны смениться на Index Scan / Index Only Scan.
+"""
+from sqlalchemy import text
+
+from biznes_vokrug_backend.database import engine
+
+QUERIES = {
+    "id организаций владельца (проверка владельца)": """
+        SELECT id FROM organizations_models WHERE owner_id = :owner_id
+    """,
+    "ИП владельца": """
+        SELECT id FROM individual_entrepreneurs_models WHERE owner_id = :owner_id
+    """,
+    "продукты организации с категорией": """
+        SELECT p.id, p.name, p.description, p.price, p.created_at, p.updated_at, c.name AS category
+        FROM products_models p LEFT OUTER JOIN product_categories c ON p.category_id = c.id
+        WHERE p.organization_id = :organization_id ORDER BY p.id
+    """,
+    "услуги ИП с категорией": """
+        SELECT s.id, s.name, s.description, s.price, s.created_at, s.updated_at, c.name AS category
+        FROM services_models s LEFT OUTER JOIN service_categories c ON s.category_id = c.id
+        WHERE s.individual_entrepreneur_id = :entrepreneur_id ORDER BY s.id
+    """,
+    "продукты страницы организаций (IN)": """
+        SELECT * FROM products_models WHERE organization_id = ANY(:organization_ids) ORDER BY id
+    """,
+    "услуги страницы организаций (IN)": """
+        SELECT * FROM services_models WHERE organization_id = ANY(:organization_ids) ORDER BY id
+    """,
+    "страница организаций по created_at": """
+        SELECT * FROM organizations_models
+        WHERE (created_at, id) > (:created_at, :organization_id)
+        ORDER BY created_at, id LIMIT 51
+    """,
+    "продукты категории": """
+        SELECT id FROM products_models WHERE category_id = :category_id
+    """,
+}
+
+
+def sample_parameters(connection) -> dict:
+    """Берёт реальные значения из базы, чтобы планы соответствовали живым данным."""
+    organization = connection.execute(text(
+        "SELECT id, owner_id, created_at FROM organizations_models ORDER BY id LIMIT 1 OFFSET "
+        "(SELECT count(*) / 2 FROM organizations_models)"
+    )).first()
+    entrepreneur_id = connection.execute(text("SELECT max(id) FROM individual_entrepreneurs_models")).scalar()
+    category_id = connection.execute(text("SELECT min(id) FROM product_categories")).scalar()
+    organization_ids = connection.execute(text(
+        "SELECT id FROM organizations_models WHERE id >= :id ORDER BY id LIMIT 50"
+    ), {"id": organization.id}).scalars().all()
+    return {
+        "owner_id": organization.owner_id,
+        "organization_id": organization.id,
+        "created_at": organization.created_at,
+        "entrepreneur_id": entrepreneur_id,
+        "category_id": category_id,
+        "organization_ids": organization_ids,
+    }
+
+
+def main():
+    with engine.connect() as connection:
+        params = sample_parameters(connection)
+        for title, sql in QUERIES.items():
+            statement = text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")
+            used = {key: value for key, value in params.items() if f":{key}" in sql}
+            plan = connection.execute(statement, used).scalars().all()
+            print(f"=== {title}")
+            print("\n".join(plan))
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Задержка цикла событий во время всплеска регистраций.
+
+Пока идут параллельные POST /api/register/, фоновая задача каждые 10 мс
+засыпает и замеряет, насколько позже запланированного она проснулась. Если
+хэширование пароля или работа с БД блокируют цикл, задержка растёт вместе
+с числом регистраций; при правильной реализации она остаётся ровной.
+
+Запуск (по умолчанию — временная база SQLite):
+
+    python -m benchmarks.register_event_loop_latency --users 50 --concurrency 25
+    python -m benchmarks.register_event_loop_latency --blocking   # хэш прямо в цикле, для сравнения
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "bench_register.db")
+# SQLite пропускает по одному писателю: ждём блокировку, а не падаем
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_PATH}?timeout=60")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+import httpx
+
+from biznes_vokrug_backend.database import Base, engine
+from biznes_vokrug_backend.main import app
+from biznes_vokrug_backend.routers import routers
+from biznes_vokrug_backend.utils.passwords import pwd_context
+
+TICK = 0.01
+
+
+async def measure_lag(samples: list, stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        samples.append(time.perf_counter() - started - TICK)
+
+
+def registration(i: int) -> dict:
+    return {
+        "user": {"name": f"Пользователь {i}", "email": f"bench{i}@example.com", "phone": None, "password": "secret"},
+        "add_organization": True,
+        "add_individual_entrepreneur": True,
+        "org_data": {"name": f"Организация {i}", "inn": f"{i:010d}", "ogrn": f"{i:013d}"},
+        "ie_data": {"name": f"ИП {i}", "inn": f"{i:012d}", "ogrnip": f"{i:015d}"},
+    }
+
+
+async def run(users: int, concurrency: int):
+    samples = []
+    stop = asyncio.Event()
+    limit = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def register(i: int):
+            async with limit:
+                response = await client.post("/api/register/", json=registration(i))
+                response.raise_for_status()
+
+        ticker = asyncio.create_task(measure_lag(samples, stop))
+        await asyncio.sleep(0.2)
+        baseline = len(samples)
+        started = time.perf_counter()
+        await asyncio.gather(*(register(i) for i in range(1, users + 1)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await ticker
+
+    burst = sorted(samples[baseline:]) or [0.0]
+    print(f"регистраций: {users}, параллельно: {concurrency}, за {elapsed:.2f} с")
+    print(
+        "задержка цикла событий, мс: "
+        f"p50={statistics.median(burst) * 1000:.1f} "
+        f"p99={burst[int(len(burst) * 0.99) - 1] * 1000:.1f} "
+        f"max={burst[-1] * 1000:.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=25)
+    parser.add_argument("--blocking", action="store_true", help="хэшировать пароль прямо в цикле событий")
+    args = parser.parse_args()
+
+    if args.blocking:
+        async def hash_in_loop(password: str) -> str:
+            return pwd_context.hash(password)
+        routers.hash_password = hash_in_loop
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    try:
+        asyncio.run(run(args.users, args.concurrency))
+    finally:
+        Base.metadata.drop_all(bind=engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Стоимость сериализации ответа без БД: страница организаций с продуктами и услугами.
+
+Сравниваются:
+  * было  — `Organization.to_dict()` + `JSONResponse` (stdlib json, даты через isoformat);
+  * core  — словари из строк Core (как в `queries.py`) + `ORJSONResponse`;
+  * orm   — ORM-объекты через pydantic-core целиком (`dump_envelope`, как у карточек);
+  * model — словари Core через `response_model` (`Page[OrganizationDetail]`): так
+    сериализовал бы FastAPI, если вернуть из обработчика данные, а не Response.
+
+Запуск:
+
+    python -m benchmarks.serialization --organizations 100 --children 10
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from biznes_vokrug_backend.models import Organization, Product, Service
+from biznes_vokrug_backend.queries import CHILD_FIELDS, ORGANIZATION_FIELDS
+from pydantic import TypeAdapter
+
+from biznes_vokrug_backend.schemas import Envelope, OrganizationDetail, Page, dump_envelope
+
+
+def child_values(i: int, owner_id: int) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "id": i,
+        "name": f"Позиция {i}",
+        "description": "Описание позиции " * 4,
+        "price": 1000.5 + i,
+        "created_at": now,
+        "updated_at": now,
+        "organization_id": owner_id,
+        "individual_entrepreneur_id": None,
+        "category_id": i % 7 or None,
+    }
+
+
+def organization_values(i: int) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "id": i,
+        "name": f"Организация {i}",
+        "description": "Описание организации " * 8,
+        "address": "г. Москва, ул. Тверская, д. 1",
+        "inn": f"{i:010d}",
+        "ogrn": f"{i:013d}",
+        "phone": "+7 900 000-00-00",
+        "website": "https://example.com",
+        "email": "info@example.com",
+        "is_verified": bool(i % 2),
+        "rating": 4.5,
+        "logo_url": None,
+        "city": "Москва",
+        "created_at": now,
+        "updated_at": now,
+        "owner_id": i,
+    }
+
+
+def build(organizations: int, children: int):
+    core, orm = [], []
+    for i in range(1, organizations + 1):
+        values = organization_values(i)
+        services = [child_values(i * 1000 + j, i) for j in range(children)]
+        products = [child_values(i * 1000 + j, i) for j in range(children)]
+        assert set(values) == set(ORGANIZATION_FIELDS) and set(services[0]) == set(CHILD_FIELDS)
+        core.append({**values, "services": services, "products": products})
+        org = Organization(**values)
+        org.services = [Service(**service) for service in services]
+        org.products = [Product(**product) for product in products]
+        orm.append(org)
+    return core, orm
+
+
+def timed(label: str, func, repeat: int):
+    func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = func()
+    per_call = (time.perf_counter() - started) / repeat
+    print(f"{label:<6} {per_call * 1000:8.2f} мс/ответ  {len(body):>9} байт")
+    return body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--organizations", type=int, default=100)
+    parser.add_argument("--children", type=int, default=10, help="продуктов и услуг на организацию (каждых)")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    core, orm = build(args.organizations, args.children)
+
+    def envelope(data):
+        return {"status": True, "data": data, "message": "Успешно"}
+
+    before = timed("было", lambda: JSONResponse(envelope([org.to_dict() for org in orm])).body, args.repeat)
+    after = timed("core", lambda: ORJSONResponse(envelope(core)).body, args.repeat)
+    orm_adapter = TypeAdapter(Envelope[list[OrganizationDetail]])
+    timed("orm", lambda: dump_envelope(orm_adapter, orm), args.repeat)
+    page_adapter = TypeAdapter(Page[OrganizationDetail])
+    timed("model", lambda: page_adapter.dump_json(page_adapter.validate_python(envelope(core))), args.repeat)
+
+    assert json.loads(before) == json.loads(after), "ответы должны совпадать"
+
+
+if __name__ == "__main__":
+    main()
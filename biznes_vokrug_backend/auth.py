@@ -1,15 +1,25 @@
+import hashlib
+import time
+import uuid
+from dataclasses import dataclass
 from fastapi import APIRouter, Depends, HTTPException
 from datetime import datetime, timedelta
 from typing import Optional
 import jwt
-from passlib.context import CryptContext
+import orjson
 import os
 from dotenv import load_dotenv
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from biznes_vokrug_backend.crud import get_user
 from .database import get_db
+from .models import IndividualEntrepreneur, Organization
+from .queries import USER_FIELDS, users_table
+from .detail_cache import TOMBSTONE
+from .revocation import get_revocation_stats, is_revoked
+from .utils.lru import TTLCache
+from .utils.redis_client import cache_delete, cache_get_json, cache_set_json, redis_call, redis_client
 
 load_dotenv()
 
@@ -17,52 +27,208 @@ SECRET_KEY = os.environ.get("SECRET_KEY")
 ALGORITHM = os.environ.get("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.environ.get("ACCESS_TOKEN_EXPIRE_MINUTES", 15))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.environ.get("REFRESH_TOKEN_EXPIRE_DAYS", 7))
+# Сколько секунд живёт в Redis набор организаций/ИП пользователя
+AUTH_CONTEXT_TTL = int(os.environ.get("AUTH_CONTEXT_TTL", 300))
+# Сколько после создания/удаления организации или ИП набор не кладётся обратно в Redis
+# (дольше любого чтения владения из БД, начатого до записи)
+AUTH_CONTEXT_TOMBSTONE_SECONDS = int(os.environ.get("AUTH_CONTEXT_TOMBSTONE_SECONDS", 5))
+# Кэш пользователя из токена: короткий срок, т.к. другие воркеры узнают об изменениях только по истечении
+PRINCIPAL_CACHE_TTL = int(os.environ.get("PRINCIPAL_CACHE_TTL", 30))
+PRINCIPAL_CACHE_SIZE = int(os.environ.get("PRINCIPAL_CACHE_SIZE", 10000))
+# Второй уровень кэша в Redis (общий для воркеров), по умолчанию выключен
+PRINCIPAL_REDIS_CACHE = os.environ.get("PRINCIPAL_REDIS_CACHE", "false").lower() in ("1", "true", "yes")
+# Кэш проверенных токенов: запись живёт не дольше exp самого токена
+TOKEN_CACHE_SIZE = int(os.environ.get("TOKEN_CACHE_SIZE", 50000))
+TOKEN_CACHE_TTL = int(os.environ.get("TOKEN_CACHE_TTL", 900))
 router = APIRouter()
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/login")
 
-# Проверка токена и получение текущего пользователя
+@dataclass(frozen=True)
+class Principal:
+    """Текущий пользователь без привязки к сессии: можно кэшировать и передавать между запросами."""
+    id: int
+    name: Optional[str]
+    email: str
+    phone: Optional[str]
+
+
+PRINCIPALS = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+
+
+def principal_key(user_id: int) -> str:
+    return f"principal:{user_id}"
+
+
+async def load_principal(db: AsyncSession, user_id: int) -> Optional[Principal]:
+    """Пользователь по ID: кэш процесса, затем Redis (если включён), затем один лёгкий запрос к БД."""
+    principal = PRINCIPALS.get(user_id)
+    if principal is not None:
+        return principal
+    if PRINCIPAL_REDIS_CACHE:
+        cached = await cache_get_json(principal_key(user_id))
+        if cached is not None:
+            principal = Principal(**cached)
+            PRINCIPALS.set(user_id, principal)
+            return principal
+    result = await db.execute(
+        select(*(users_table.c[field] for field in USER_FIELDS)).where(users_table.c.id == user_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    principal = Principal(**row._mapping)
+    PRINCIPALS.set(user_id, principal)
+    if PRINCIPAL_REDIS_CACHE:
+        await cache_set_json(principal_key(user_id), row._asdict(), PRINCIPAL_CACHE_TTL)
+    return principal
+
+
+async def invalidate_principal(user_id: int) -> None:
+    """Вызывать после изменения или удаления пользователя."""
+    PRINCIPALS.pop(user_id)
+    if PRINCIPAL_REDIS_CACHE:
+        await cache_delete(principal_key(user_id))
+
 
 # Функция для получения текущего пользователя
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> Principal:
     if not token:
         raise HTTPException(status_code=401, detail="Токен отсутствует")
     try:
-        payload = verify_token(token)
+        payload = await authenticate_token(token)
         user_id: str = payload.get("sub")
         if not user_id:
             raise HTTPException(status_code=401, detail="Неверный токен")
-        user = get_user(db, int(user_id))
+        user = await load_principal(db, int(user_id))
         if not user:
             raise HTTPException(status_code=401, detail="Пользователь не найден")
         return user
     except Exception as e:
         raise HTTPException(status_code=401, detail="Неверный токен")
 
+
+@dataclass(frozen=True)
+class AuthContext:
+    """Текущий пользователь и то, чем он владеет: проверки прав без запросов к БД."""
+    user: Principal
+    organization_ids: frozenset
+    entrepreneur_id: Optional[int]
+
+    def owns_organization(self, organization_id: int) -> bool:
+        return organization_id in self.organization_ids
+
+    def owns_entrepreneur(self, entrepreneur_id: int) -> bool:
+        return entrepreneur_id is not None and entrepreneur_id == self.entrepreneur_id
+
+
+def auth_context_key(user_id: int) -> str:
+    return f"authz:owned:{user_id}"
+
+
+async def load_owned_ids(db: AsyncSession, user_id: int) -> dict:
+    """ID организаций и ИП пользователя одним запросом (UNION ALL)."""
+    result = await db.execute(union_all(
+        select(literal("organization").label("kind"), Organization.id)
+        .filter(Organization.owner_id == user_id),
+        select(literal("entrepreneur").label("kind"), IndividualEntrepreneur.id)
+        .filter(IndividualEntrepreneur.owner_id == user_id),
+    ))
+    owned = {"organizations": [], "entrepreneur": None}
+    for kind, owned_id in result.all():
+        if kind == "organization":
+            owned["organizations"].append(owned_id)
+        else:
+            owned["entrepreneur"] = owned_id
+    return owned
+
+
+async def get_auth_context(
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> AuthContext:
+    """
+    Зависимость для эндпоинтов с проверкой владения. Набор ID берётся из Redis,
+    при промахе (или недоступном Redis) — одним запросом к БД.
+
+    Как и в detail_cache, кэш заполняется только через SET NX: набор, прочитанный
+    до создания организации, не перезапишет «надгробие» от `invalidate_auth_context`.
+    """
+    key = auth_context_key(current_user.id)
+    cached = await redis_call(f"чтение {key}", redis_client.get, key)
+    if cached is not None and cached != TOMBSTONE:
+        owned = orjson.loads(cached)
+    else:
+        owned = await load_owned_ids(db, current_user.id)
+        if cached is None:
+            await redis_call(
+                f"запись {key}", redis_client.set, key, orjson.dumps(owned), ex=AUTH_CONTEXT_TTL, nx=True
+            )
+    return AuthContext(
+        user=current_user,
+        organization_ids=frozenset(owned["organizations"]),
+        entrepreneur_id=owned["entrepreneur"],
+    )
+
+
+async def invalidate_auth_context(user_id: int) -> None:
+    """Вызывать после создания/удаления организации или ИП пользователя."""
+    key = auth_context_key(user_id)
+    await redis_call(
+        f"сброс {key}", redis_client.set, key, TOMBSTONE, ex=AUTH_CONTEXT_TOMBSTONE_SECONDS, force=True
+    )
+
 # Utility Functions
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    # jti — идентификатор конкретного токена, по нему работает отзыв (logout)
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+VERIFIED_TOKENS = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
+
+
 def verify_token(token: str):
+    """
+    Проверяет подпись и срок токена. Клиент повторяет один и тот же токен весь срок
+    его жизни, поэтому успешно проверенные claims кэшируются по sha256 токена до его exp.
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    claims = VERIFIED_TOKENS.get(digest)
+    if claims is not None:
+        return dict(claims)
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    expires_in = payload["exp"] - time.time() if "exp" in payload else None
+    if expires_in is None or expires_in > 0:
+        VERIFIED_TOKENS.set(digest, payload, ttl=expires_in)
+    return dict(payload)
+
+
+async def authenticate_token(token: str) -> dict:
+    """verify_token плюс проверка отзыва по jti (см. revocation.py)."""
+    payload = verify_token(token)
+    jti = payload.get("jti")
+    if jti and await is_revoked(jti):
+        raise HTTPException(status_code=401, detail="Токен отозван")
+    return payload
+
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+def get_auth_cache_stats() -> dict:
+    return {
+        "tokens": VERIFIED_TOKENS.stats(),
+        "principals": PRINCIPALS.stats(),
+        "revocations": get_revocation_stats(),
+    }
@@ -0,0 +1,98 @@
+"""
+Справочники категорий для выпадающих списков.
+
+Категории меняются несколько раз в год, поэтому каждый воркер держит готовые
+тела ответов (JSON в байтах) и их ETag в памяти: запрос списка не трогает ни БД,
+ни Redis. Кэш заполняется при старте приложения.
+
+Для инвалидации в Redis лежит счётчик-версия `categories:version`. Кто меняет
+категории, вызывает `bump_categories_version()`; воркеры раз в
+CATEGORY_CHECK_SECONDS сверяют версию и при расхождении перечитывают таблицы.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+import orjson
+from sqlalchemy.exc import SQLAlchemyError
+
+from .database import AsyncSessionLocal
+from .queries import category_key_values, product_categories_table, service_categories_table
+from .utils.redis_client import redis_call, redis_client
+
+CATEGORY_TABLES = {
+    "services": service_categories_table,
+    "products": product_categories_table,
+}
+CATEGORY_VERSION_KEY = "categories:version"
+CATEGORY_CHECK_SECONDS = float(os.getenv("CATEGORY_CHECK_SECONDS", 30))
+# Сколько браузер и прокси могут не переспрашивать; дальше — дешёвая ревалидация по ETag
+CATEGORY_MAX_AGE = int(os.getenv("CATEGORY_MAX_AGE", 300))
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedCategories:
+    body: bytes
+    etag: str
+
+
+_cache: dict = {}
+# Версия из Redis, с которой согласован _cache (None — Redis не ответил)
+_version: Optional[bytes] = None
+
+
+async def load_categories(sessionmaker=None) -> None:
+    """
+    Перечитывает все справочники и заменяет кэш целиком. Читает из основной БД:
+    после `bump_categories_version` отстающая реплика отдала бы старые категории,
+    и они жили бы в кэше до следующей смены версии.
+    """
+    global _cache
+    cache = {}
+    async with (sessionmaker or AsyncSessionLocal)() as db:
+        for kind, table in CATEGORY_TABLES.items():
+            body = orjson.dumps(await category_key_values(db, table))
+            # ETag по содержимому: у всех воркеров с одинаковыми данными он совпадает
+            cache[kind] = CachedCategories(body, '"%s"' % hashlib.sha256(body).hexdigest()[:32])
+    _cache = cache
+
+
+async def refresh_categories() -> None:
+    """Запоминает версию и перечитывает справочники (версия — до чтения, чтобы не пропустить изменение)."""
+    global _version
+    version = await redis_call("версия категорий", redis_client.get, CATEGORY_VERSION_KEY)
+    await load_categories()
+    _version = version
+
+
+async def get_categories(kind: str) -> CachedCategories:
+    cached = _cache.get(kind)
+    if cached is None:
+        # Кэш не заполнился при старте (например, БД была недоступна)
+        await load_categories()
+        cached = _cache[kind]
+    return cached
+
+
+async def bump_categories_version() -> None:
+    """Сообщает всем воркерам, что категории изменились. Ошибки Redis пробрасываются."""
+    await redis_client.incr(CATEGORY_VERSION_KEY)
+    await load_categories()
+
+
+async def watch_categories() -> None:
+    """Фоновая задача воркера: перечитывает справочники, когда меняется версия в Redis."""
+    while True:
+        await asyncio.sleep(CATEGORY_CHECK_SECONDS)
+        # Пока Redis недоступен, версию не узнать — остаёмся на загруженных данных
+        version = await redis_call("версия категорий", redis_client.get, CATEGORY_VERSION_KEY, default=_version)
+        try:
+            if version != _version:
+                await refresh_categories()
+        except (SQLAlchemyError, OSError) as e:
+            logger.warning("Не удалось обновить кэш категорий: %s", e)
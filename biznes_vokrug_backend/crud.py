@@ -1,26 +1,31 @@
 # app/crud/user_crud.py
 
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
-from .models import User
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import USER_OWNED, User
 from .schemas import UserCreate
+from .utils.passwords import hash_password
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def get_user_by_email(db: Session, email: str):
-    return db.query(User).filter(User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(
+        select(User)
+        .filter(User.email == email)
+        .options(*USER_OWNED)
+    )
+    return result.scalars().first()
 
-def get_user(db: Session, user_id: int):
-    return db.query(User).filter(User.id == user_id).first()
+async def get_user(db: AsyncSession, user_id: int):
+    result = await db.execute(select(User).filter(User.id == user_id))
+    return result.scalars().first()
 
-def create_user(db: Session, user: UserCreate):
-    hashed_password = pwd_context.hash(user.password)
+async def create_user(db: AsyncSession, user: UserCreate):
+    hashed_password = await hash_password(user.password)
     db_user = User(
         name=user.name,
         email=user.email,
         hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
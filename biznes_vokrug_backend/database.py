@@ -1,19 +1,189 @@
+import itertools
 import os
-from sqlalchemy import create_engine
+import time
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from dotenv import load_dotenv
 
+from .utils.lru import TTLCache
+from .utils.metrics import Counter, Histogram
+from .utils.redis_client import redis_call, redis_client
+
 # Load environment variables from .env file
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+# Настройки пула соединений (на один воркер)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# Реплики для чтения (через запятую). Без них всё идёт в основную БД.
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+# Сколько секунд после записи пользователь читает из основной БД (read-your-writes)
+READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", 5))
+READ_YOUR_WRITES_CACHE_SIZE = int(os.getenv("DB_READ_YOUR_WRITES_CACHE_SIZE", 10000))
+
+# Асинхронные драйверы для синхронных URL из DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Переводит синхронный URL (psycopg2, pysqlite) на асинхронный драйвер."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Нет асинхронного драйвера для БД {backend!r}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def pool_options(url: str) -> dict:
+    """Параметры пула из окружения; SQLite (тесты, локальный запуск) работает на пуле по умолчанию."""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+# Время ожидания соединения из пула, секунды
+POOL_WAIT_SECONDS = Histogram([0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10])
+POOL_TIMEOUTS = Counter()
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Пул, который замеряет время получения соединения и считает таймауты."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
+
+
+# ASYNC_DATABASE_URL можно задать явно, иначе он выводится из DATABASE_URL.
+# Синхронный движок остаётся для Alembic и служебных скриптов.
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+
+engine = create_engine(DATABASE_URL, **pool_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-def get_db():
+def create_timed_async_engine(url: str):
+    options = pool_options(url)
+    if options:
+        options["poolclass"] = TimedAsyncAdaptedQueuePool
+    return create_async_engine(url, **options)
+
+
+def create_async_sessionmaker(bind):
+    # expire_on_commit=False: после commit объекты остаются читаемыми без неявного
+    # обращения к БД, которое в асинхронном режиме недопустимо
+    return async_sessionmaker(bind=bind, autoflush=False, expire_on_commit=False, class_=AsyncSession)
+
+
+async_engine = create_timed_async_engine(ASYNC_DATABASE_URL)
+AsyncSessionLocal = create_async_sessionmaker(async_engine)
+
+replica_engines = [create_timed_async_engine(to_async_url(url)) for url in DATABASE_REPLICA_URLS]
+ReplicaSessionLocals = [create_async_sessionmaker(replica) for replica in replica_engines]
+_replica_cycle = itertools.cycle(ReplicaSessionLocals)
+
+
+def engine_pool_stats(engine) -> dict:
+    # У QueuePool нет публичного геттера max_overflow: отдаём настроенное значение из pool_options()
+    pool = engine.pool
+    stats = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "max_overflow": DB_MAX_OVERFLOW,
+            "timeout": pool.timeout(),
+        })
+    return stats
+
+
+def get_pool_stats() -> dict:
+    """Текущее состояние пулов (основная БД и реплики) и распределение времени ожидания."""
+    stats = engine_pool_stats(async_engine)
+    stats["replicas"] = [engine_pool_stats(replica) for replica in replica_engines]
+    stats["timeouts"] = POOL_TIMEOUTS.value
+    stats["wait_seconds"] = POOL_WAIT_SECONDS.snapshot()
+    return stats
+
+
+def read_sessionmaker(prefer_primary: bool = False):
+    """Фабрика сессий для чтения: реплики по кругу, основная БД — если реплик нет или нужна свежесть."""
+    if prefer_primary or not ReplicaSessionLocals:
+        return AsyncSessionLocal
+    return next(_replica_cycle)
+
+
+# Отметки «пользователь недавно писал»: у себя в процессе и в Redis для остальных воркеров
+RECENT_WRITERS = TTLCache(maxsize=READ_YOUR_WRITES_CACHE_SIZE, ttl=READ_YOUR_WRITES_SECONDS)
+
+
+def last_write_key(user_id: int) -> str:
+    return f"rw:last_write:{user_id}"
+
+
+async def mark_write(user_id: int, window_seconds: float = READ_YOUR_WRITES_SECONDS) -> None:
+    """Следующие window_seconds чтения пользователя идут в основную БД (см. ReadYourWritesMiddleware)."""
+    RECENT_WRITERS.set(user_id, True, ttl=window_seconds)
+    await redis_call(
+        f"отметка записи {user_id}", redis_client.set, last_write_key(user_id), 1,
+        px=max(int(window_seconds * 1000), 1),
+    )
+
+
+async def wrote_recently(user_id: Optional[int]) -> bool:
+    """Пользователь недавно что-то записал и должен читать из основной БД; анонимы читают из реплик."""
+    if user_id is None:
+        return False
+    if RECENT_WRITERS.get(user_id):
+        return True
+    # Без Redis видны только записи, прошедшие через этот воркер
+    return bool(await redis_call(f"проверка записи {user_id}", redis_client.exists, last_write_key(user_id), default=0))
+
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_read_db(request: Request):
+    """Сессия только для чтения: для GET-обработчиков, которые можно отдать репликам."""
+    # Пока реплик нет, всё и так читается из основной БД — Redis не спрашиваем
+    prefer_primary = bool(ReplicaSessionLocals) and await wrote_recently(getattr(request.state, "user_id", None))
+    async with read_sessionmaker(prefer_primary)() as db:
+        yield db
+
+
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
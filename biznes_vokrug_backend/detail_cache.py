@@ -0,0 +1,128 @@
+"""
+Кэш карточек организаций и ИП в Redis (read-through).
+
+Хранится готовое тело ответа в байтах вместе с его ETag и Last-Modified, так что
+попадание не требует ни запросов к БД, ни повторной сериализации, а условный
+запрос получает 304 прямо из кэша. Поиск организации по ОГРН идёт через ключ-
+псевдоним `detail:organization:ogrn:<ogrn>` -> id.
+
+Запись меняет карточку — роут после коммита вызывает `invalidate_details`. Вместо
+удаления ключ на DETAIL_CACHE_TOMBSTONE_SECONDS заменяется «надгробием»: чтение,
+начатое до записи (или попавшее на отстающую реплику), не сможет положить в кэш
+старую версию, потому что кэш заполняется только через SET NX.
+"""
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Optional
+
+import orjson
+
+from .database import READ_YOUR_WRITES_SECONDS
+from .utils.metrics import Counter
+from .utils.redis_client import redis_call, redis_client
+
+DETAIL_CACHE_TTL = int(os.getenv("DETAIL_CACHE_TTL", 300))
+# Не меньше окна чтения из основной БД после записи (≈ допустимое отставание реплик)
+DETAIL_CACHE_TOMBSTONE_SECONDS = int(os.getenv("DETAIL_CACHE_TOMBSTONE_SECONDS", max(READ_YOUR_WRITES_SECONDS, 5)))
+TOMBSTONE = b"-"
+
+ORGANIZATION = "organization"
+ENTREPRENEUR = "entrepreneur"
+
+HITS = Counter()
+MISSES = Counter()
+
+
+@dataclass(frozen=True)
+class CachedDetail:
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime]
+    ogrn: Optional[str] = None
+
+
+def detail_key(kind: str, id: int) -> str:
+    return f"detail:{kind}:{id}"
+
+
+def ogrn_key(ogrn: str) -> str:
+    return f"detail:{ORGANIZATION}:ogrn:{ogrn}"
+
+
+def _encode(detail: CachedDetail) -> bytes:
+    meta = {
+        "etag": detail.etag,
+        "last_modified": detail.last_modified.isoformat() if detail.last_modified else None,
+        "ogrn": detail.ogrn,
+    }
+    return orjson.dumps(meta) + b"\n" + detail.body
+
+
+def _decode(raw: bytes) -> CachedDetail:
+    meta, body = raw.split(b"\n", 1)
+    meta = orjson.loads(meta)
+    last_modified = datetime.fromisoformat(meta["last_modified"]) if meta["last_modified"] else None
+    return CachedDetail(body, meta["etag"], last_modified, meta["ogrn"])
+
+
+async def get_detail(kind: str, id: int) -> Optional[CachedDetail]:
+    """Карточка из кэша; None при промахе, «надгробии» или недоступном Redis."""
+    raw = await redis_call(f"чтение карточки {kind} {id}", redis_client.get, detail_key(kind, id))
+    if not raw or raw == TOMBSTONE:
+        MISSES.inc()
+        return None
+    HITS.inc()
+    return _decode(raw)
+
+
+async def get_organization_by_ogrn(ogrn: str) -> Optional[CachedDetail]:
+    id = await redis_call(f"чтение карточки по ОГРН {ogrn}", redis_client.get, ogrn_key(ogrn))
+    if id is None:
+        MISSES.inc()
+        return None
+    detail = await get_detail(ORGANIZATION, int(id))
+    # ОГРН мог измениться: псевдоним тогда указывает на чужую карточку
+    return detail if detail is not None and detail.ogrn == ogrn else None
+
+
+async def store_detail(kind: str, id: int, detail: CachedDetail) -> None:
+    async def store():
+        async with redis_client.pipeline(transaction=False) as pipe:
+            # NX: не перезаписывать «надгробие» от только что прошедшей записи
+            pipe.set(detail_key(kind, id), _encode(detail), ex=DETAIL_CACHE_TTL, nx=True)
+            if detail.ogrn:
+                pipe.set(ogrn_key(detail.ogrn), id, ex=DETAIL_CACHE_TTL)
+            await pipe.execute()
+
+    await redis_call(f"запись карточки {kind} {id}", store)
+
+
+async def invalidate_details(
+    organization_ids: Iterable[Optional[int]] = (),
+    entrepreneur_ids: Iterable[Optional[int]] = (),
+) -> None:
+    """Сбрасывает карточки после изменения (None в списках пропускаются)."""
+    keys = {detail_key(ORGANIZATION, id) for id in organization_ids if id is not None}
+    keys |= {detail_key(ENTREPRENEUR, id) for id in entrepreneur_ids if id is not None}
+    if not keys:
+        return
+
+    async def invalidate():
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.set(key, TOMBSTONE, ex=DETAIL_CACHE_TOMBSTONE_SECONDS)
+            await pipe.execute()
+
+    # Если Redis так и не ответил, устаревшая карточка проживёт не дольше DETAIL_CACHE_TTL
+    await redis_call(f"сброс карточек {sorted(keys)}", invalidate, force=True)
+
+
+def get_detail_cache_stats() -> dict:
+    hits, misses = HITS.value, MISSES.value
+    return {
+        "ttl": DETAIL_CACHE_TTL,
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+    }
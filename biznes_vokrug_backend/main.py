@@ -1,18 +1,59 @@
+import asyncio
+import contextlib
+import logging
+from contextlib import asynccontextmanager
 from typing import Union
 import uvicorn
 from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse, FileResponse
+from fastapi.responses import ORJSONResponse, RedirectResponse, FileResponse
+from sqlalchemy.exc import SQLAlchemyError
 
 from biznes_vokrug_backend.auth import get_current_user
 
 from .routers.routers import router
 from .routers.category_product import category_product
+from .routers.internal import internal, verify_internal_token
+from .routers.search import search
+from .routers.export import export
 from .auth import oauth2_scheme
+from .database import DATABASE_REPLICA_URLS
+from .middleware import CompressionMiddleware, ReadYourWritesMiddleware
+from .revocation import listen_for_revocations
+from .categories import refresh_categories, watch_categories
+from .utils.passwords import shutdown_hash_executor
+from .utils.redis_client import close_redis
+from .utils.redis_dadata import close_dadata_client
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Справочники категорий — в память воркера до первого запроса
+    try:
+        await refresh_categories()
+    except (SQLAlchemyError, OSError) as e:
+        logger.warning("Кэш категорий не заполнен при старте, загрузится по первому запросу: %s", e)
+    # Фильтр отозванных токенов и версия категорий синхронизируются с Redis в фоне
+    tasks = [asyncio.create_task(listen_for_revocations()), asyncio.create_task(watch_categories())]
+    yield
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    await close_dadata_client()
+    await close_redis()
+    shutdown_hash_executor()
+
+
 app = FastAPI(
     title="Your API",
     description="API documentation with authorization required",
-
+    lifespan=lifespan,
+    # Ответы, возвращённые словарём или моделью, тоже кодируются orjson
+    default_response_class=ORJSONResponse,
 )
 
 @app.get("/")
@@ -30,9 +71,28 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if DATABASE_REPLICA_URLS:
+    # После записи клиент какое-то время читает из основной БД, а не из отстающей реплики
+    app.add_middleware(ReadYourWritesMiddleware)
+# Снаружи остальных: сжимается окончательный ответ (gzip или brotli, если он установлен)
+app.add_middleware(CompressionMiddleware)
 
 app.include_router(router, prefix="/api", tags=["базовые роуты"])
 app.include_router(category_product, prefix="/api/category-products", tags=["категории и продукты"])
+app.include_router(search, prefix="/api", tags=["поиск"])
+# Полная выгрузка — только для вошедших пользователей (см. также EXPORT_MAX_CONCURRENT)
+app.include_router(
+    export,
+    prefix="/api/export",
+    tags=["выгрузка"],
+    dependencies=[Depends(get_current_user)],
+)
+app.include_router(
+    internal,
+    prefix="/api/internal",
+    tags=["служебные"],
+    dependencies=[Depends(verify_internal_token)],
+)
 # app.include_router(router, prefix="/api", tags=["User management"], dependencies=[Depends(oauth2_scheme)])
 
 if __name__ == "__main__":
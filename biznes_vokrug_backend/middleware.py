@@ -0,0 +1,231 @@
+import os
+import zlib
+from typing import Optional
+
+from fastapi import HTTPException
+from starlette.datastructures import Headers, MutableHeaders
+
+from .auth import verify_token
+from .database import READ_YOUR_WRITES_SECONDS, mark_write
+
+try:
+    import brotli
+except ImportError:  # brotli — необязательная зависимость, без неё остаётся gzip
+    brotli = None
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Меньшие ответы сжимать невыгодно: экономия байтов меньше накладных расходов
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 6))
+# Средний уровень brotli: почти максимум сжатия JSON при умеренной цене CPU
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 5))
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+PRECOMPRESSED_PREFIXES = ("image/", "video/", "audio/", "font/woff")
+PRECOMPRESSED_TYPES = {
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/x-7z-compressed",
+    "application/x-rar-compressed",
+    "application/pdf",
+    "application/octet-stream",
+}
+
+
+class ReadYourWritesMiddleware:
+    """
+    Read-your-writes для реплик, по пользователю из Bearer-токена.
+
+    Для каждого запроса с действительным токеном кладёт ID пользователя в
+    `request.state.user_id`. После успешного изменяющего запроса отмечает пользователя
+    как недавно писавшего (`database.mark_write`, отметка видна всем воркерам через
+    Redis): его чтения в течение window_seconds идут в основную БД, а не в реплики
+    (см. `database.get_read_db`). Анонимные запросы ничего не отмечают.
+    """
+
+    def __init__(self, app, window_seconds: float = READ_YOUR_WRITES_SECONDS):
+        self.app = app
+        self.window_seconds = window_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        user_id = bearer_user_id(Headers(scope=scope).get("authorization", ""))
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+        scope.setdefault("state", {})["user_id"] = user_id
+        if scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_marking_write(message):
+            # Отметка ставится до отправки ответа: следующий запрос клиента её уже увидит
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                await mark_write(user_id, self.window_seconds)
+            await send(message)
+
+        await self.app(scope, receive, send_marking_write)
+
+
+def bearer_user_id(authorization: str) -> Optional[int]:
+    """ID пользователя (`sub`) из заголовка `Authorization: Bearer ...`; None без действительного токена."""
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        # Проверка подписи кэшируется по токену, так что повторный разбор в get_current_user бесплатен
+        return int(verify_token(token)["sub"])
+    except (HTTPException, KeyError, TypeError, ValueError):
+        return None
+
+
+class CompressionMiddleware:
+    """
+    Сжатие ответов по Accept-Encoding: brotli (если установлен пакет `brotli`) или gzip.
+
+    Ответы меньше minimum_size отдаются как есть. Потоковые ответы (StreamingResponse)
+    сжимаются по частям: каждая часть сбрасывается клиенту сразу, без накопления всего тела.
+    Не трогаются ответы, у которых уже есть Content-Encoding (в том числе `identity` —
+    так роут может явно отказаться от сжатия), и уже сжатые форматы: картинки, видео,
+    архивы, PDF — например, файлы из MinIO.
+
+    Сильный ETag сжатого ответа становится слабым (`W/"..."`): байты тела уже не те,
+    что у несжатого представления. Так же помечается и 304 для клиента, принимающего
+    сжатие. If-None-Match сравнивается слабо (`http_cache.etag_matches`), поэтому
+    ревалидация работает с обоими вариантами.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressingResponder(self.app, encoding, self.minimum_size)(scope, receive, send)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Лучшая поддерживаемая кодировка из Accept-Encoding с учётом q-значений."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip()] = quality
+    for encoding in SUPPORTED_ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def is_precompressed(content_type: str) -> bool:
+    content_type = content_type.split(";", 1)[0].strip().lower()
+    if content_type == "image/svg+xml":  # текст, хорошо сжимается
+        return False
+    return content_type.startswith(PRECOMPRESSED_PREFIXES) or content_type in PRECOMPRESSED_TYPES
+
+
+class _CompressingResponder:
+    def __init__(self, app, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, scope, receive, send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message):
+        if message["type"] == "http.response.start":
+            # Заголовки отправим, когда станет ясно, сжимаем ли тело
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = "content-encoding" in headers or is_precompressed(headers.get("content-type", ""))
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+        if self.passthrough:
+            if self.start_message is not None:
+                await self.send(self.start_message)
+                self.start_message = None
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                if start["status"] == 304:
+                    weaken_etag(MutableHeaders(raw=start["headers"]))
+                await self.send(start)
+                await self.send(message)
+                return
+            self.compressor = Compressor(self.encoding)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            weaken_etag(headers)
+            if more_body:
+                del headers["Content-Length"]
+                await self.send(start)
+            else:
+                compressed = self.compressor.finish(body)
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+
+        if more_body:
+            chunk = self.compressor.flush(body)
+            if chunk:
+                await self.send({"type": "http.response.body", "body": chunk, "more_body": True})
+        else:
+            await self.send({"type": "http.response.body", "body": self.compressor.finish(body)})
+
+
+def weaken_etag(headers: MutableHeaders) -> None:
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = "W/" + etag
+
+
+class Compressor:
+    """Потоковый компрессор: flush отдаёт всё, что можно отправить сейчас, finish закрывает поток."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: формат gzip
+
+    def flush(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
@@ -1,6 +1,6 @@
 from typing import List, Optional
-from sqlalchemy import String, Integer, ForeignKey, Boolean, DateTime, Float
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy import String, Integer, ForeignKey, Boolean, DateTime, Float, Index
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship, selectinload
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -14,11 +14,13 @@ class User(Base):
     phone: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     hashed_password: Mapped[str] = mapped_column(String, nullable=False)
 
+    # lazy="raise": связи загружаются только явно (selectinload/joinedload),
+    # неявный запрос при сериализации сразу даёт ошибку вместо N+1
     organizations: Mapped[List["Organization"]] = relationship(
-        back_populates="owner", cascade="all, delete-orphan"
+        back_populates="owner", cascade="all, delete-orphan", lazy="raise"
     )
     individual_entrepreneur: Mapped[Optional["IndividualEntrepreneur"]] = relationship(
-        back_populates="owner", uselist=False, cascade="all, delete-orphan"
+        back_populates="owner", uselist=False, cascade="all, delete-orphan", lazy="raise"
     )
     def to_dict(self):
         return {
@@ -26,13 +28,19 @@ class User(Base):
             "name": self.name,
             "email": self.email,
             "phone": self.phone,
-            # Include related models if needed
-            "organizations": self.organizations if self.organizations else None,
-            "individual_entrepreneur": self.individual_entrepreneur if self.individual_entrepreneur else None,
+            # Связанные модели в кратком виде key-value
+            "organizations": [org.to_key_value() for org in self.organizations] if self.organizations else None,
+            "individual_entrepreneur": self.individual_entrepreneur.to_key_value() if self.individual_entrepreneur else None,
         }
 
 class Organization(Base):
     __tablename__ = "organizations_models"
+    __table_args__ = (
+        # Проверки владельца и выборка id организаций пользователя (index-only scan)
+        Index("ix_organizations_models_owner_id", "owner_id", "id"),
+        # Keyset-пагинация списка по created_at
+        Index("ix_organizations_models_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String, nullable=False)
@@ -60,10 +68,10 @@ class Organization(Base):
     owner: Mapped["User"] = relationship(back_populates="organizations")
 
     services: Mapped[List["Service"]] = relationship(
-        back_populates="organization", cascade="all, delete-orphan"
+        back_populates="organization", cascade="all, delete-orphan", lazy="raise"
     )
     products: Mapped[List["Product"]] = relationship(
-        back_populates="organization", cascade="all, delete-orphan"
+        back_populates="organization", cascade="all, delete-orphan", lazy="raise"
     )
 
     def to_dict(self):
@@ -94,21 +102,30 @@ class Organization(Base):
     
 class IndividualEntrepreneur(Base):
     __tablename__ = "individual_entrepreneurs_models"
+    __table_args__ = (
+        Index("ix_individual_entrepreneurs_models_owner_id", "owner_id", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String, nullable=False)
     inn: Mapped[str] = mapped_column(String, unique=True, nullable=False)
     ogrnip: Mapped[str] = mapped_column(String, unique=True, nullable=False)
     phone: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    updated_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=True
+    )
     owner_id: Mapped[int] = mapped_column(ForeignKey("user_models.id"))
 
     owner: Mapped["User"] = relationship(back_populates="individual_entrepreneur")
 
     services: Mapped[List["Service"]] = relationship(
-        back_populates="individual_entrepreneur", cascade="all, delete-orphan"
+        back_populates="individual_entrepreneur", cascade="all, delete-orphan", lazy="raise"
     )
     products: Mapped[List["Product"]] = relationship(
-        back_populates="individual_entrepreneur", cascade="all, delete-orphan"
+        back_populates="individual_entrepreneur", cascade="all, delete-orphan", lazy="raise"
     )
 
     def to_dict(self):
@@ -129,13 +146,21 @@ class IndividualEntrepreneur(Base):
 # Service model for Organization and IndividualEntrepreneur
 class Service(Base):
     __tablename__ = "services_models"
+    __table_args__ = (
+        # Списки услуг владельца: фильтр по FK и сортировка по id без отдельной сортировки
+        Index("ix_services_models_organization_id", "organization_id", "id"),
+        Index("ix_services_models_individual_entrepreneur_id", "individual_entrepreneur_id", "id"),
+        Index("ix_services_models_category_id", "category_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String, nullable=False)
     description: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     price: Mapped[Optional[Float]] = mapped_column(Float, nullable=True)
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
-    updated_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), onupdate=func.now())
+    updated_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
 
     organization_id: Mapped[Optional[int]] = mapped_column(ForeignKey("organizations_models.id"))
     individual_entrepreneur_id: Mapped[Optional[int]] = mapped_column(ForeignKey("individual_entrepreneurs_models.id"))
@@ -147,17 +172,38 @@ class Service(Base):
     category_id: Mapped[Optional[int]] = mapped_column(ForeignKey("service_categories.id"))
     category: Mapped[Optional["ServiceCategory"]] = relationship(back_populates="services")
 
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "price": self.price,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "organization_id": self.organization_id,
+            "individual_entrepreneur_id": self.individual_entrepreneur_id,
+            "category_id": self.category_id,
+        }
+
 
 # Обновление модели Product
 class Product(Base):
     __tablename__ = "products_models"
+    __table_args__ = (
+        # Списки продуктов владельца: фильтр по FK и сортировка по id без отдельной сортировки
+        Index("ix_products_models_organization_id", "organization_id", "id"),
+        Index("ix_products_models_individual_entrepreneur_id", "individual_entrepreneur_id", "id"),
+        Index("ix_products_models_category_id", "category_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String, nullable=False)
     description: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     price: Mapped[Optional[Float]] = mapped_column(Float, nullable=True)
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
-    updated_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), onupdate=func.now())
+    updated_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
 
     organization_id: Mapped[Optional[int]] = mapped_column(ForeignKey("organizations_models.id"))
     individual_entrepreneur_id: Mapped[Optional[int]] = mapped_column(ForeignKey("individual_entrepreneurs_models.id"))
@@ -227,4 +273,14 @@ class ProductCategory(Base):
     
     def to_key_value(self):
         """Метод для получения id и name в формате key-value."""
-        return {"key": self.id, "value": self.name}
\ No newline at end of file
+        return {"key": self.id, "value": self.name}
+
+
+# Опции загрузки дочерних коллекций для to_dict(): по одному SELECT ... IN (...)
+# на связь для всей выборки, независимо от числа строк
+ORGANIZATION_CHILDREN = (selectinload(Organization.services), selectinload(Organization.products))
+ENTREPRENEUR_CHILDREN = (
+    selectinload(IndividualEntrepreneur.services),
+    selectinload(IndividualEntrepreneur.products),
+)
+USER_OWNED = (selectinload(User.organizations), selectinload(User.individual_entrepreneur))
@@ -0,0 +1,147 @@
+"""
+Лёгкий слой чтения для списков: SQLAlchemy Core вместо ORM.
+
+Запросы выбирают только нужные колонки и возвращают строки (Row/RowMapping)
+без identity map и инструментирования атрибутов; сериализаторы ниже выдают
+те же словари, что и `to_dict()` моделей. Даты остаются datetime: их в ISO 8601
+кодирует ORJSONResponse, без промежуточных строк в Python.
+"""
+from collections import defaultdict
+from typing import Iterable, Sequence
+
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import IndividualEntrepreneur, Organization, Product, ProductCategory, Service, ServiceCategory, User
+
+users_table = User.__table__
+organizations_table = Organization.__table__
+entrepreneurs_table = IndividualEntrepreneur.__table__
+products_table = Product.__table__
+services_table = Service.__table__
+product_categories_table = ProductCategory.__table__
+service_categories_table = ServiceCategory.__table__
+
+USER_FIELDS = ("id", "name", "email", "phone")
+ORGANIZATION_FIELDS = (
+    "id", "name", "description", "address", "inn", "ogrn", "phone", "website", "email",
+    "is_verified", "rating", "logo_url", "city", "created_at", "updated_at", "owner_id",
+)
+ENTREPRENEUR_FIELDS = ("id", "name", "inn", "ogrnip", "phone", "owner_id")
+CHILD_FIELDS = (
+    "id", "name", "description", "price", "created_at", "updated_at",
+    "organization_id", "individual_entrepreneur_id", "category_id",
+)
+LISTING_FIELDS = ("id", "name", "description", "price", "created_at", "updated_at")
+
+
+def organizations_select():
+    return select(*(organizations_table.c[field] for field in ORGANIZATION_FIELDS))
+
+
+def entrepreneurs_select():
+    return select(*(entrepreneurs_table.c[field] for field in ENTREPRENEUR_FIELDS))
+
+
+def serialize_child(row) -> dict:
+    """Строка продукта/услуги -> словарь в формате `Product.to_dict()`."""
+    return dict(row)
+
+
+async def load_children(db: AsyncSession, owner_field: str, owner_ids: Sequence[int]):
+    """
+    Продукты и услуги для набора владельцев: по одному запросу на таблицу.
+
+    Возвращает (services_by_owner, products_by_owner), сгруппированные по `owner_field`.
+    """
+    grouped = []
+    for table in (services_table, products_table):
+        by_owner = defaultdict(list)
+        if owner_ids:
+            result = await db.execute(
+                select(*(table.c[field] for field in CHILD_FIELDS))
+                .where(table.c[owner_field].in_(owner_ids))
+                .order_by(table.c.id)
+            )
+            for row in result.mappings():
+                by_owner[row[owner_field]].append(serialize_child(row))
+        grouped.append(by_owner)
+    return grouped
+
+
+async def serialize_organizations(db: AsyncSession, rows: Iterable) -> list[dict]:
+    """Строки организаций -> словари в формате `Organization.to_dict()`."""
+    rows = list(rows)
+    services, products = await load_children(db, "organization_id", [row.id for row in rows])
+    organizations = []
+    for row in rows:
+        data = dict(row._mapping)
+        data["services"] = services.get(row.id, [])
+        data["products"] = products.get(row.id, [])
+        organizations.append(data)
+    return organizations
+
+
+async def serialize_entrepreneurs(db: AsyncSession, rows: Iterable) -> list[dict]:
+    """Строки ИП -> словари в формате `IndividualEntrepreneur.to_dict()`."""
+    rows = list(rows)
+    services, products = await load_children(db, "individual_entrepreneur_id", [row.id for row in rows])
+    entrepreneurs = []
+    for row in rows:
+        data = dict(row._mapping)
+        data["services"] = services.get(row.id, [])
+        data["products"] = products.get(row.id, [])
+        entrepreneurs.append(data)
+    return entrepreneurs
+
+
+async def list_products(db: AsyncSession, owner_field: str, owner_id: int) -> list[dict]:
+    """Продукты организации или ИП с названием категории (одним запросом с LEFT JOIN)."""
+    return await _list_with_category(db, products_table, product_categories_table, owner_field, owner_id)
+
+
+async def list_services(db: AsyncSession, owner_field: str, owner_id: int) -> list[dict]:
+    """Услуги организации или ИП с названием категории (одним запросом с LEFT JOIN)."""
+    return await _list_with_category(db, services_table, service_categories_table, owner_field, owner_id)
+
+
+async def _list_with_category(db: AsyncSession, table, categories_table, owner_field: str, owner_id: int):
+    result = await db.execute(
+        select(
+            *(table.c[field] for field in LISTING_FIELDS),
+            categories_table.c.name.label("category"),
+        )
+        .select_from(table.outerjoin(categories_table, table.c.category_id == categories_table.c.id))
+        .where(table.c[owner_field] == owner_id)
+        .order_by(table.c.id)
+    )
+    return [dict(row) for row in result.mappings()]
+
+
+async def category_key_values(db: AsyncSession, categories_table) -> list[dict]:
+    """Категории в формате key-value для выпадающих списков."""
+    result = await db.execute(
+        select(categories_table.c.id.label("key"), categories_table.c.name.label("value"))
+        .order_by(categories_table.c.id)
+    )
+    return [dict(row) for row in result.mappings()]
+
+
+async def owned_key_values(db: AsyncSession, user_id: int):
+    """
+    Организации и ИП пользователя в формате key-value (как в `User.to_dict()`)
+    одним запросом. Возвращает (organizations, individual_entrepreneur).
+    """
+    result = await db.execute(union_all(
+        select(literal("organization").label("kind"), organizations_table.c.id, organizations_table.c.name)
+        .where(organizations_table.c.owner_id == user_id),
+        select(literal("entrepreneur").label("kind"), entrepreneurs_table.c.id, entrepreneurs_table.c.name)
+        .where(entrepreneurs_table.c.owner_id == user_id),
+    ))
+    organizations, entrepreneur = [], None
+    for kind, owned_id, name in result.all():
+        if kind == "organization":
+            organizations.append({"key": owned_id, "value": name})
+        else:
+            entrepreneur = {"key": owned_id, "value": name if name else "Без имени"}
+    return organizations, entrepreneur
@@ -0,0 +1,125 @@
+"""
+Отзыв токенов (logout) по jti.
+
+Источник истины — Redis: ключ `revoked:jti:<jti>` живёт до истечения токена, а
+сортированное множество `revoked:jtis` (score = exp) позволяет выгрузить все
+действующие отзывы. Каждый воркер держит в памяти фильтр Блума с этими jti,
+поэтому обычный случай — токен не отозван — проверяется без обращения к сети.
+Только при срабатывании фильтра (настоящий отзыв или редкое ложное срабатывание)
+jti перепроверяется в Redis.
+
+Новые отзывы доходят до воркеров через pub/sub сразу, а полная пересинхронизация
+раз в REVOCATION_SYNC_SECONDS подхватывает пропущенные сообщения и выбрасывает
+из фильтра истёкшие jti.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from .utils.bloom import BloomFilter
+from .utils.metrics import Counter
+from .utils.redis_client import redis_client
+
+REVOCATION_KEY_PREFIX = "revoked:jti:"
+REVOCATION_SET = "revoked:jtis"
+REVOCATION_CHANNEL = "revoked-tokens"
+REVOCATION_SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", 30))
+REVOCATION_RETRY_SECONDS = float(os.getenv("REVOCATION_RETRY_SECONDS", 5))
+REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", 100000))
+REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", 0.001))
+
+logger = logging.getLogger(__name__)
+
+REDIS_LOOKUPS = Counter()
+FALSE_POSITIVES = Counter()
+
+_bloom = BloomFilter(REVOCATION_BLOOM_CAPACITY, REVOCATION_BLOOM_ERROR_RATE)
+# jti, отозванные, пока идёт пересинхронизация: их нельзя потерять при замене фильтра
+_added_during_sync: Optional[set] = None
+_last_sync: Optional[float] = None
+
+
+def _remember(jti: str):
+    _bloom.add(jti)
+    if _added_during_sync is not None:
+        _added_during_sync.add(jti)
+
+
+async def revoke(jti: str, expires_at: float) -> None:
+    """Отзывает токен до его истечения. Ошибки Redis пробрасываются: отзыв не должен теряться молча."""
+    ttl = max(int(expires_at - time.time()), 1)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.set(REVOCATION_KEY_PREFIX + jti, 1, ex=ttl)
+        pipe.zadd(REVOCATION_SET, {jti: expires_at})
+        pipe.publish(REVOCATION_CHANNEL, jti)
+        await pipe.execute()
+    _remember(jti)
+
+
+async def is_revoked(jti: str) -> bool:
+    if jti not in _bloom:
+        return False
+    REDIS_LOOKUPS.inc()
+    try:
+        revoked = bool(await redis_client.exists(REVOCATION_KEY_PREFIX + jti))
+    except RedisError as e:
+        # Фильтр сработал, а подтвердить нечем: безопаснее считать токен отозванным
+        logger.warning("Redis недоступен при проверке отзыва токена: %s", e)
+        return True
+    if not revoked:
+        FALSE_POSITIVES.inc()
+    return revoked
+
+
+async def sync_revocations() -> None:
+    """Перестраивает фильтр по действующим отзывам из Redis."""
+    global _bloom, _added_during_sync, _last_sync
+    _added_during_sync = set()
+    try:
+        now = time.time()
+        await redis_client.zremrangebyscore(REVOCATION_SET, "-inf", now)
+        jtis = await redis_client.zrangebyscore(REVOCATION_SET, now, "+inf")
+        bloom = BloomFilter(max(REVOCATION_BLOOM_CAPACITY, len(jtis)), REVOCATION_BLOOM_ERROR_RATE)
+        for jti in jtis:
+            bloom.add(jti.decode())
+        for jti in _added_during_sync:
+            bloom.add(jti)
+        _bloom = bloom
+        _last_sync = time.time()
+    finally:
+        _added_during_sync = None
+
+
+async def listen_for_revocations() -> None:
+    """Фоновая задача воркера: pub/sub с отзывами и периодическая пересинхронизация."""
+    while True:
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        try:
+            # Сначала подписка, потом выгрузка: отзыв между ними придёт сообщением
+            await pubsub.subscribe(REVOCATION_CHANNEL)
+            await sync_revocations()
+            while True:
+                message = await pubsub.get_message(timeout=1.0)
+                if message is not None:
+                    _remember(message["data"].decode())
+                elif time.time() - _last_sync >= REVOCATION_SYNC_SECONDS:
+                    await sync_revocations()
+        except (RedisError, OSError) as e:
+            logger.warning("Синхронизация отзывов токенов прервана: %s", e)
+        finally:
+            await pubsub.aclose()
+        await asyncio.sleep(REVOCATION_RETRY_SECONDS)
+
+
+def get_revocation_stats() -> dict:
+    return {
+        "bloom_items": _bloom.count,
+        "bloom_bits": _bloom.size,
+        "redis_lookups": REDIS_LOOKUPS.value,
+        "false_positives": FALSE_POSITIVES.value,
+        "last_sync": _last_sync,
+    }
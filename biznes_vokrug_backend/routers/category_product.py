@@ -1,13 +1,16 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Form, HTTPException, UploadFile, File, Response, Body
-from fastapi.responses import JSONResponse, StreamingResponse
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, Form, HTTPException, UploadFile, File, Request, Response, Body
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from biznes_vokrug_backend.auth import (
     create_access_token,
     create_refresh_token,
+    AuthContext,
+    Principal,
+    get_auth_context,
     get_current_user,
-    verify_password,
     verify_token
 )
 from biznes_vokrug_backend.crud import get_user_by_email
@@ -16,12 +19,15 @@ from fastapi import FastAPI, HTTPException, Depends, status, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from datetime import datetime, timedelta, timezone
 import os
-from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 from pydantic import BaseModel
-from ..database import get_db
+from ..categories import CATEGORY_MAX_AGE, get_categories
+from ..database import get_db, get_read_db
+from ..queries import list_products, list_services
+from ..utils.http_cache import cached_json_response
 from ..models import IndividualEntrepreneur, Product, ProductCategory, Service, ServiceCategory, User, Organization
 from ..schemas import (
+    CategoryOption,
     IndividualEntrepreneurCreate,
     IndividualEntrepreneurResponse,
     IndividualEntrepreneurUpdate,
@@ -33,7 +39,6 @@ from ..schemas import (
     OrganizationResponse,
     UserUpdate
 )
-from passlib.context import CryptContext
 
 load_dotenv()
 
@@ -41,7 +46,8 @@ SECRET_KEY = os.environ.get("SECRET_KEY")
 ALGORITHM = os.environ.get("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.environ.get("ACCESS_TOKEN_EXPIRE_MINUTES", 15))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.environ.get("REFRESH_TOKEN_EXPIRE_DAYS", 7))
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+CATEGORIES_CACHE_CONTROL = f"public, max-age={CATEGORY_MAX_AGE}"
 
 category_product = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
@@ -122,174 +128,83 @@ product_categories_data = [
 # GET-запрос для получения продуктов пользователя, разделенных по ИП и организации
 # GET-запрос для получения продуктов пользователя, разделенных по ИП и организации
 @category_product.get("/organization/products")
-def get_organization_products(
+async def get_organization_products(
     organization_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    auth: AuthContext = Depends(get_auth_context)
 ):
-    try:
-        # Проверяем, принадлежит ли организация текущему пользователю
-        organization = db.query(Organization).filter(
-            Organization.id == organization_id,
-            Organization.owner_id == current_user.id
-        ).first()
-
-        if not organization:
-            raise HTTPException(status_code=403, detail="Организация не найдена или не принадлежит пользователю.")
+    # Проверяем, принадлежит ли организация текущему пользователю
+    if not auth.owns_organization(organization_id):
+        raise HTTPException(status_code=403, detail="Организация не найдена или не принадлежит пользователю.")
 
+    try:
         # Получение продуктов
-        org_products = (
-            db.query(Product)
-            .filter(Product.organization_id == organization_id)
-            .options(joinedload(Product.category))
-            .all()
-        )
-
-        return [
-            {
-                "id": product.id,
-                "name": product.name,
-                "description": product.description,
-                "price": product.price,
-                "category": product.category.name if product.category else None,
-                "created_at": product.created_at,
-                "updated_at": product.updated_at,
-            }
-            for product in org_products
-        ]
+        return await list_products(db, "organization_id", organization_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ошибка получения продуктов: {e}")
     
 @category_product.get("/entrepreneur/products")
-def get_individual_entrepreneur_products(
+async def get_individual_entrepreneur_products(
     entrepreneur_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    auth: AuthContext = Depends(get_auth_context)
 ):
-    try:
-        # Проверяем, принадлежит ли ИП текущему пользователю
-        entrepreneur = db.query(IndividualEntrepreneur).filter(
-            IndividualEntrepreneur.id == entrepreneur_id,
-            IndividualEntrepreneur.owner_id == current_user.id
-        ).first()
-
-        if not entrepreneur:
-            raise HTTPException(status_code=403, detail="ИП не найден или не принадлежит пользователю.")
+    # Проверяем, принадлежит ли ИП текущему пользователю
+    if not auth.owns_entrepreneur(entrepreneur_id):
+        raise HTTPException(status_code=403, detail="ИП не найден или не принадлежит пользователю.")
 
+    try:
         # Получение продуктов
-        ie_products = (
-            db.query(Product)
-            .filter(Product.individual_entrepreneur_id == entrepreneur_id)
-            .options(joinedload(Product.category))
-            .all()
-        )
-
-        return [
-            {
-                "id": product.id,
-                "name": product.name,
-                "description": product.description,
-                "price": product.price,
-                "category": product.category.name if product.category else None,
-                "created_at": product.created_at,
-                "updated_at": product.updated_at,
-            }
-            for product in ie_products
-        ]
+        return await list_products(db, "individual_entrepreneur_id", entrepreneur_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ошибка получения продуктов: {e}")
 @category_product.get("/organization/services")
-def get_organization_services(
+async def get_organization_services(
     organization_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    auth: AuthContext = Depends(get_auth_context)
 ):
-    try:
-        # Проверяем, принадлежит ли организация текущему пользователю
-        organization = db.query(Organization).filter(
-            Organization.id == organization_id,
-            Organization.owner_id == current_user.id
-        ).first()
-
-        if not organization:
-            raise HTTPException(status_code=403, detail="Организация не найдена или не принадлежит пользователю.")
+    # Проверяем, принадлежит ли организация текущему пользователю
+    if not auth.owns_organization(organization_id):
+        raise HTTPException(status_code=403, detail="Организация не найдена или не принадлежит пользователю.")
 
+    try:
         # Получение услуг
-        org_services = (
-            db.query(Service)
-            .filter(Service.organization_id == organization_id)
-            .options(joinedload(Service.category))
-            .all()
-        )
-
-        return [
-            {
-                "id": service.id,
-                "name": service.name,
-                "description": service.description,
-                "price": service.price,
-                "category": service.category.name if service.category else None,
-                "created_at": service.created_at,
-                "updated_at": service.updated_at,
-            }
-            for service in org_services
-        ]
+        return await list_services(db, "organization_id", organization_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ошибка получения услуг: {e}")
 
 @category_product.get("/entrepreneur/services")
-def get_individual_entrepreneur_services(
+async def get_individual_entrepreneur_services(
     entrepreneur_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    auth: AuthContext = Depends(get_auth_context)
 ):
-    try:
-        # Проверяем, принадлежит ли ИП текущему пользователю
-        entrepreneur = db.query(IndividualEntrepreneur).filter(
-            IndividualEntrepreneur.id == entrepreneur_id,
-            IndividualEntrepreneur.owner_id == current_user.id
-        ).first()
-
-        if not entrepreneur:
-            raise HTTPException(status_code=403, detail="ИП не найден или не принадлежит пользователю.")
+    # Проверяем, принадлежит ли ИП текущему пользователю
+    if not auth.owns_entrepreneur(entrepreneur_id):
+        raise HTTPException(status_code=403, detail="ИП не найден или не принадлежит пользователю.")
 
+    try:
         # Получение услуг
-        ie_services = (
-            db.query(Service)
-            .filter(Service.individual_entrepreneur_id == entrepreneur_id)
-            .options(joinedload(Service.category))
-            .all()
-        )
-
-        return [
-            {
-                "id": service.id,
-                "name": service.name,
-                "description": service.description,
-                "price": service.price,
-                "category": service.category.name if service.category else None,
-                "created_at": service.created_at,
-                "updated_at": service.updated_at,
-            }
-            for service in ie_services
-        ]
+        return await list_services(db, "individual_entrepreneur_id", entrepreneur_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ошибка получения услуг: {e}")
 
-@category_product.get("/service-categories-dropdown", response_model=list[dict])
-def get_service_categories_dropdown(db: Session = Depends(get_db)):
+@category_product.get("/service-categories-dropdown", response_model=list[CategoryOption])
+async def get_service_categories_dropdown(request: Request):
+    # Из кэша воркера: без обращения к БД, с ETag для повторных запросов
     try:
-        categories = db.query(ServiceCategory).all()
-        return [category.to_key_value() for category in categories]
+        cached = await get_categories("services")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ошибка получения категорий сервисов: {e}")
+    return cached_json_response(request, cached.body, cached.etag, CATEGORIES_CACHE_CONTROL)
 
 
 # GET-запрос для получения категорий продуктов
-@category_product.get("/product-categories-dropdown", response_model=list[dict])
-def get_product_categories_dropdown(db: Session = Depends(get_db)):
+@category_product.get("/product-categories-dropdown", response_model=list[CategoryOption])
+async def get_product_categories_dropdown(request: Request):
     try:
-        categories = db.query(ProductCategory).all()
-        return [category.to_key_value() for category in categories]
+        cached = await get_categories("products")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Ошибка получения категорий продуктов: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Ошибка получения категорий продуктов: {e}")
+    return cached_json_response(request, cached.body, cached.etag, CATEGORIES_CACHE_CONTROL)
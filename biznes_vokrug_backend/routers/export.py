@@ -0,0 +1,109 @@
+import asyncio
+import csv
+import io
+import os
+from typing import Literal
+
+import orjson
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from ..database import read_sessionmaker
+from ..queries import (
+    CHILD_FIELDS,
+    ORGANIZATION_FIELDS,
+    organizations_select,
+    organizations_table,
+    products_table,
+    serialize_child,
+    serialize_organizations,
+    services_table,
+)
+
+export = APIRouter()
+
+# Сколько строк читается с серверного курсора и пишется в ответ за раз
+EXPORT_CHUNK_SIZE = 500
+# Одновременных выгрузок на воркер: каждая держит соединение и курсор до конца ответа
+EXPORT_MAX_CONCURRENT = int(os.getenv("EXPORT_MAX_CONCURRENT", 2))
+
+_export_slots = asyncio.Semaphore(EXPORT_MAX_CONCURRENT)
+
+CSV_EXPORTS = {
+    "organizations": (organizations_table, ORGANIZATION_FIELDS),
+    "products": (products_table, CHILD_FIELDS),
+    "services": (services_table, CHILD_FIELDS),
+}
+
+
+async def organizations_ndjson():
+    # Сессия открывается внутри генератора: зависимость get_db закрывается
+    # раньше, чем StreamingResponse допишет тело ответа. Полная выгрузка
+    # не требует свежести, поэтому всегда читает с реплики (если она есть).
+    async with read_sessionmaker()() as db:
+        stream = await db.stream(
+            organizations_select()
+            .order_by(organizations_table.c.id)
+            .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+        async for rows in stream.partitions():
+            # Продукты и услуги — одним запросом на таблицу для всей пачки
+            organizations = await serialize_organizations(db, rows)
+            yield b"".join(orjson.dumps(organization) + b"\n" for organization in organizations)
+
+
+async def table_csv(table, fields):
+    async with read_sessionmaker()() as db:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        stream = await db.stream(
+            select(*(table.c[field] for field in fields))
+            .order_by(table.c.id)
+            .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+        async for rows in stream.partitions():
+            writer.writerows(rows)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+
+async def limited(stream):
+    """Держит слот выгрузки, пока генератор читает из БД; слот освобождается и при обрыве."""
+    async with _export_slots:
+        async for chunk in stream:
+            yield chunk
+
+
+def check_export_slot():
+    # Предварительная проверка: занять слот можно только в генераторе, а отказ нужен
+    # до начала ответа. При гонке лишняя выгрузка просто подождёт свободного слота.
+    if _export_slots.locked():
+        raise HTTPException(status_code=429, detail="Слишком много одновременных выгрузок, повторите позже")
+
+
+@export.get("/organizations.ndjson")
+async def export_organizations_ndjson():
+    """Полная выгрузка организаций с продуктами и услугами, по объекту JSON на строку."""
+    check_export_slot()
+    return StreamingResponse(
+        limited(organizations_ndjson()),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="organizations.ndjson"'},
+    )
+
+
+@export.get("/{entity}.csv")
+async def export_csv(entity: Literal["organizations", "products", "services"]):
+    """Плоская выгрузка таблицы организаций, продуктов или услуг в CSV."""
+    table, fields = CSV_EXPORTS[entity]
+    check_export_slot()
+    return StreamingResponse(
+        limited(table_csv(table, fields)),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{entity}.csv"'},
+    )
@@ -0,0 +1,94 @@
+import hmac
+import os
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import ORJSONResponse
+from dotenv import load_dotenv
+from redis.exceptions import RedisError
+
+from ..auth import get_auth_cache_stats
+from ..categories import bump_categories_version
+from ..detail_cache import get_detail_cache_stats
+from ..database import get_pool_stats
+from ..utils.passwords import get_hashing_stats
+from ..utils.redis_client import get_redis_stats
+from ..utils.redis_dadata import get_dadata_stats
+
+load_dotenv()
+
+# Без заданного токена служебные роуты недоступны (404), в том числе локально
+INTERNAL_API_TOKEN = os.environ.get("INTERNAL_API_TOKEN")
+
+internal = APIRouter()
+
+
+def verify_internal_token(x_internal_token: Optional[str] = Header(None)):
+    if not INTERNAL_API_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_internal_token is None or not hmac.compare_digest(x_internal_token, INTERNAL_API_TOKEN):
+        raise HTTPException(status_code=403, detail="Доступ запрещён")
+
+
+@internal.get("/pool-stats")
+async def pool_stats():
+    return ORJSONResponse(
+        content={"status": True, "data": get_pool_stats(), "message": "Успешно"},
+        status_code=200,
+    )
+
+
+@internal.get("/password-hashing")
+async def password_hashing_stats():
+    return ORJSONResponse(
+        content={"status": True, "data": get_hashing_stats(), "message": "Успешно"},
+        status_code=200,
+    )
+
+
+@internal.get("/auth-cache")
+async def auth_cache_stats():
+    """Попадания в кэши проверенных токенов и пользователей."""
+    return ORJSONResponse(
+        content={"status": True, "data": get_auth_cache_stats(), "message": "Успешно"},
+        status_code=200,
+    )
+
+
+@internal.get("/detail-cache")
+async def detail_cache_stats():
+    """Попадания в кэш карточек организаций и ИП."""
+    return ORJSONResponse(
+        content={"status": True, "data": get_detail_cache_stats(), "message": "Успешно"},
+        status_code=200,
+    )
+
+
+@internal.get("/redis")
+async def redis_stats():
+    """Состояние предохранителя Redis: разомкнут ли он и сколько вызовов кэша пропущено."""
+    return ORJSONResponse(
+        content={"status": True, "data": get_redis_stats(), "message": "Успешно"},
+        status_code=200,
+    )
+
+
+@internal.get("/dadata")
+async def dadata_stats():
+    """Запросы к DaData и сколько из них объединено с уже выполняющимися."""
+    return ORJSONResponse(
+        content={"status": True, "data": get_dadata_stats(), "message": "Успешно"},
+        status_code=200,
+    )
+
+
+@internal.post("/categories/reload")
+async def reload_categories():
+    """Вызывать после изменения категорий в БД: все воркеры перечитают справочники."""
+    try:
+        await bump_categories_version()
+    except RedisError:
+        raise HTTPException(status_code=503, detail="Не удалось обновить версию категорий, повторите попытку позже")
+    return ORJSONResponse(
+        content={"status": True, "message": "Версия категорий обновлена"},
+        status_code=200,
+    )
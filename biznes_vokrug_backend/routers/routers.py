@@ -1,39 +1,109 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, Form, HTTPException, UploadFile, File, Response, Body
-from fastapi.responses import JSONResponse, StreamingResponse
-from sqlalchemy.orm import Session, joinedload
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, Form, HTTPException, UploadFile, File, Query, Request, Response, Body
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from biznes_vokrug_backend.auth import (
     create_access_token,
     create_refresh_token,
+    AuthContext,
+    Principal,
+    authenticate_token,
+    get_auth_context,
     get_current_user,
-    verify_password,
+    invalidate_auth_context,
+    invalidate_principal,
     verify_token
 )
-from biznes_vokrug_backend.crud import get_user_by_email
-from biznes_vokrug_backend.utils.redis_dadata import get_address_suggestions
+from biznes_vokrug_backend.revocation import revoke
+from biznes_vokrug_backend.crud import get_user, get_user_by_email
+from biznes_vokrug_backend.utils.redis_dadata import (
+    DADATA_MAX_SUGGESTIONS_COUNT,
+    DADATA_SUGGESTIONS_COUNT,
+    SuggestionsUnavailable,
+    get_address_suggestions,
+)
+from biznes_vokrug_backend.utils.passwords import hash_password, verify_and_update_password
+from biznes_vokrug_backend.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_paginate, split_page
 from fastapi import FastAPI, HTTPException, Depends, status, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from datetime import datetime, timedelta, timezone
 import os
-from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 from pydantic import BaseModel
-from ..database import get_db
-from ..models import IndividualEntrepreneur, Product, Service, User, Organization
+from ..database import get_db, get_read_db
+from ..queries import (
+    CHILD_FIELDS,
+    ENTREPRENEUR_FIELDS,
+    ORGANIZATION_FIELDS,
+    USER_FIELDS,
+    entrepreneurs_select,
+    entrepreneurs_table,
+    organizations_select,
+    organizations_table,
+    owned_key_values,
+    products_table,
+    serialize_child,
+    serialize_entrepreneurs,
+    serialize_organizations,
+    services_table,
+    users_table,
+)
+from ..detail_cache import (
+    ENTREPRENEUR,
+    ORGANIZATION,
+    CachedDetail,
+    get_detail,
+    invalidate_details,
+    store_detail,
+)
+from ..detail_cache import get_organization_by_ogrn as get_cached_organization_by_ogrn
+from ..utils.http_cache import is_conditional, not_modified, validator_headers
+from ..versions import fetch_detail_version, loaded_detail_version
+from ..writes import (
+    delete_returning,
+    fetch_owner_columns,
+    owned_child_filter,
+    table_values,
+    touch_owners,
+    update_returning,
+)
+from ..models import (
+    ENTREPRENEUR_CHILDREN,
+    ORGANIZATION_CHILDREN,
+    USER_OWNED,
+    IndividualEntrepreneur,
+    Product,
+    Service,
+    User,
+    Organization,
+)
 from ..schemas import (
+    ENTREPRENEUR_DETAIL,
+    ORGANIZATION_DETAIL,
+    PRODUCT_RESPONSE,
+    SERVICE_RESPONSE,
     IndividualEntrepreneurCreate,
+    IndividualEntrepreneurDetail,
     IndividualEntrepreneurResponse,
     IndividualEntrepreneurUpdate,
+    ProductBatchCreate,
     ProductCreate,
+    ServiceBatchCreate,
     ServiceCreate,
     UserCreate,
     OrganizationCreate,
+    OrganizationDetail,
     OrganizationUpdate,
     OrganizationResponse,
-    UserUpdate
+    Page,
+    UserUpdate,
+    dump_envelope,
 )
-from passlib.context import CryptContext
 
 load_dotenv()
 
@@ -41,19 +111,37 @@ SECRET_KEY = os.environ.get("SECRET_KEY")
 ALGORITHM = os.environ.get("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.environ.get("ACCESS_TOKEN_EXPIRE_MINUTES", 15))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.environ.get("REFRESH_TOKEN_EXPIRE_DAYS", 7))
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
+# Допустимые сортировки списка организаций для keyset-пагинации
+ORGANIZATION_ORDERINGS = {
+    "id": (Organization.id,),
+    "created_at": (Organization.created_at, Organization.id),
+}
+ORGANIZATION_ORDER_KEYS = {
+    "id": ("id",),
+    "created_at": ("created_at", "id"),
+}
+
 @router.post("/login")
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = get_user_by_email(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await get_user_by_email(db, form_data.username)
+    if not user:
         raise HTTPException(status_code=400, detail="Неверные учетные данные")
+    valid, new_hash = await verify_and_update_password(form_data.password, user.hashed_password)
+    if not valid:
+        raise HTTPException(status_code=400, detail="Неверные учетные данные")
+    if new_hash:
+        # Прозрачно переводим устаревший хэш (bcrypt) на argon2
+        await db.execute(
+            update(users_table).where(users_table.c.id == user.id).values(hashed_password=new_hash)
+        )
+        await db.commit()
 
     access_token = create_access_token({"sub": str(user.id)})
     refresh_token = create_refresh_token({"sub": str(user.id)})
@@ -66,24 +154,41 @@ def login(
     }
 
 @router.post("/logout")
-def logout():
-    # Если вы не храните токены на сервере, просто возвращайте сообщение
+async def logout(
+    token: str = Depends(oauth2_scheme),
+    refresh_token: Optional[str] = Body(None, embed=True),
+):
+    # Отзываем токен доступа и, если передан, токен обновления того же пользователя
+    access_payload = await authenticate_token(token)
+    revoked = [access_payload]
+    if refresh_token:
+        refresh_payload = verify_token(refresh_token)
+        if refresh_payload.get("sub") != access_payload.get("sub"):
+            raise HTTPException(status_code=400, detail="Токен обновления принадлежит другому пользователю")
+        revoked.append(refresh_payload)
+
+    try:
+        for payload in revoked:
+            if payload.get("jti"):
+                await revoke(payload["jti"], payload["exp"])
+    except RedisError:
+        raise HTTPException(status_code=503, detail="Не удалось завершить сеанс, повторите попытку позже")
     return {"message": "Вы вышли из системы"}
 
 @router.post("/refresh")
-def refresh_token_endpoint(
+async def refresh_token_endpoint(
     refresh_token: str = Body(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     if not refresh_token:
         raise HTTPException(status_code=401, detail="Токен обновления отсутствует")
 
     try:
-        payload = verify_token(refresh_token)
+        payload = await authenticate_token(refresh_token)
         user_id: str = payload.get("sub")
         if not user_id:
             raise HTTPException(status_code=401, detail="Неверный токен")
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await get_user(db, int(user_id))
         if not user:
             raise HTTPException(status_code=401, detail="Пользователь не найден")
         new_access_token = create_access_token({"sub": user_id})
@@ -101,23 +206,27 @@ async def register_user(
     add_individual_entrepreneur: bool = Body(False),  # Флаг добавления ИП
     org_data: Optional[OrganizationCreate] = None,
     ie_data: Optional[IndividualEntrepreneurCreate] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    print("add_organization:", add_organization)
-    print("add_individual_entrepreneur:", add_individual_entrepreneur)
+    # Проверяем входные данные до любых записей в БД
+    if add_organization and not org_data:
+        raise HTTPException(status_code=400, detail="Необходимо указать данные организации.")
+    if add_individual_entrepreneur and not ie_data:
+        raise HTTPException(status_code=400, detail="Необходимо указать данные ИП.")
 
     # Проверяем, существует ли пользователь с таким email
-    existing_user = db.query(User).filter(User.email == user.email).first()
-    if existing_user:
-        return JSONResponse(
+    result = await db.execute(select(User.id).filter(User.email == user.email))
+    if result.first():
+        return ORJSONResponse(
             content={"status": False, "message": "Пользователь уже существует"},
             status_code=200,
         )
 
-    # Хэшируем пароль пользователя
-    hashed_password = pwd_context.hash(user.password)
-    
-    # Создание пользователя
+    # Хэшируем пароль пользователя (вне цикла событий)
+    hashed_password = await hash_password(user.password)
+
+    # Пользователь, организация и ИП создаются в одной транзакции: связи через owner,
+    # поэтому все INSERT выполняются одним flush при commit, без промежуточных commit/refresh
     new_user = User(
         name=user.name,
         email=user.email,
@@ -125,62 +234,35 @@ async def register_user(
         hashed_password=hashed_password
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    print(add_organization)
-    # Если пользователь выбрал организацию
     if add_organization:
-        if not org_data:
-            raise HTTPException(status_code=400, detail="Необходимо указать данные организации.")
-        new_organization = Organization(
-            name=org_data.name,
-            description=org_data.description,
-            address=org_data.address,
-            inn=org_data.inn,
-            ogrn=org_data.ogrn,
-            phone=org_data.phone,
-            website=org_data.website,
-            email=org_data.email,
-            category=org_data.category,
-            is_verified=org_data.is_verified,
-            rating=org_data.rating,
-            logo_url=org_data.logo_url,
-            city=org_data.city,
-            owner_id=new_user.id,
-            updated_at=datetime.utcnow() 
-        )
-        db.add(new_organization)
-        db.commit()
-        db.refresh(new_organization)
-
-    # Если пользователь выбрал ИП
+        db.add(Organization(**org_data.model_dump(), owner=new_user))
     if add_individual_entrepreneur:
-        if not ie_data:
-            raise HTTPException(status_code=400, detail="Необходимо указать данные ИП.")
-        new_entrepreneur = IndividualEntrepreneur(
-            inn=ie_data.inn,
-            ogrnip=ie_data.ogrnip,
-            phone=ie_data.phone,
-            owner_id=new_user.id
+        db.add(IndividualEntrepreneur(**ie_data.model_dump(), owner=new_user))
+
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Гонка с параллельной регистрацией или занятые ИНН/ОГРН/ОГРНИП
+        await db.rollback()
+        return ORJSONResponse(
+            content={"status": False, "message": "Пользователь, организация или ИП с такими данными уже существуют"},
+            status_code=400,
         )
-        db.add(new_entrepreneur)
-        db.commit()
-        db.refresh(new_entrepreneur)
-    
-    return JSONResponse(
+
+    return ORJSONResponse(
         content={"status": True,"message": "Пользователь успешно создан"},
         status_code=200,
     )
 
 from fastapi import HTTPException, status
 @router.get("/user/details")
-def get_user_details(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_user_details(
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     # Загружаем связанные данные пользователя
-    user = (
-        db.query(User)
+    result = await db.execute(
+        select(User)
         .filter(User.id == current_user.id)
         .options(
             joinedload(User.organizations).joinedload(Organization.services),
@@ -188,8 +270,8 @@ def get_user_details(
             joinedload(User.individual_entrepreneur).joinedload(IndividualEntrepreneur.services),
             joinedload(User.individual_entrepreneur).joinedload(IndividualEntrepreneur.products),
         )
-        .first()
     )
+    user = result.unique().scalars().first()
 
     if not user:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
@@ -228,34 +310,32 @@ def get_user_details(
     }
 
 @router.put("/user/update")
-def update_user_info(
+async def update_user_info(
     user_data: UserUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    # 1. Ищем пользователя по текущему токену/сессии
-    user = db.query(User).filter(User.id == current_user.id).first()
-    if not user:
+    # 1. Обновляем только разрешённые поля одним UPDATE ... RETURNING;
+    # поля, пришедшие как None, не меняем
+    # (при необходимости здесь можно проверить, что новый email ещё не занят)
+    row = await update_returning(
+        db, users_table, (users_table.c.id == current_user.id,),
+        user_data.model_dump(exclude_none=True), USER_FIELDS,
+    )
+    if row is None:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
 
-    # 2. Обновляем только разрешённые поля
-    # Проверяем, что пришли не None; если поле None, не меняем его
-    if user_data.name is not None:
-        user.name = user_data.name
-    if user_data.email is not None:
-        # При необходимости можно проверить, что такой email ещё не занят
-        # или провести другую валидацию
-        user.email = user_data.email
-    if user_data.phone is not None:
-        user.phone = user_data.phone
-
-    # 3. Сохраняем изменения
-    db.commit()
-    db.refresh(user)
-
-    # 4. Возвращаем обновлённого пользователя (можно в формате user.to_dict())
-    return JSONResponse(
-        content={"status": True, "data": user.to_dict(), "message": "Пользователь успешно обновлен"},
+    # 2. Организации и ИП в кратком виде — одним запросом, в той же транзакции
+    organizations, entrepreneur = await owned_key_values(db, current_user.id)
+    await db.commit()
+    await invalidate_principal(current_user.id)
+
+    # 3. Возвращаем обновлённого пользователя в формате user.to_dict()
+    user = dict(row._mapping)
+    user["organizations"] = organizations or None
+    user["individual_entrepreneur"] = entrepreneur
+    return ORJSONResponse(
+        content={"status": True, "data": user, "message": "Пользователь успешно обновлен"},
         status_code=200,
     )
 
@@ -266,8 +346,8 @@ def update_user_info(
 # @router.post("/user/change-password")
 # def change_user_password(
 #     password_data: UserChangePassword,
-#     db: Session = Depends(get_db),
-#     current_user: User = Depends(get_current_user)
+#     db: AsyncSession = Depends(get_db),
+#     current_user: Principal = Depends(get_current_user)
 # ):
 #     user = db.query(User).filter(User.id == current_user.id).first()
 #     if not user:
@@ -287,13 +367,14 @@ def update_user_info(
 #     return {"detail": "Пароль успешно изменён"}
 
 @router.post("/organizations/")
-def create_organization(
+async def create_organization(
     org_data: OrganizationCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     # Проверяем, существует ли организация с таким же ОГРН
-    existing_org = db.query(Organization).filter(Organization.ogrn == org_data.ogrn).first()
+    result = await db.execute(select(Organization).filter(Organization.ogrn == org_data.ogrn))
+    existing_org = result.scalars().first()
     if existing_org:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -303,125 +384,189 @@ def create_organization(
     # Создаём новую организацию
     new_org = Organization(**org_data.model_dump(), owner_id=current_user.id)
     db.add(new_org)
-    db.commit()
-    db.refresh(new_org)
-    return JSONResponse(
-        content={"status": True, "data": new_org.to_dict(), "message": "Успешно добавлена"},
+    await db.commit()
+    await invalidate_auth_context(current_user.id)
+    await db.refresh(new_org, ["created_at", "updated_at", "services", "products"])
+    return Response(
+        content=dump_envelope(ORGANIZATION_DETAIL, new_org, "Успешно добавлена"),
+        media_type="application/json",
         status_code=status.HTTP_201_CREATED,
     )
 
-@router.get("/organizations", response_model=list[dict])  # Указываем, что возвращаем список словарей
-def get_all_organizations(limit: int | None = None, db: Session = Depends(get_db)):
+@router.get("/organizations", response_model=Page[OrganizationDetail])
+async def get_all_organizations(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order_by: Literal["id", "created_at"] = "id",
+    db: AsyncSession = Depends(get_read_db),
+):
     """
-    Получить список организаций с возможным ограничением по количеству.
+    Получить страницу организаций (keyset-пагинация).
     
     Args:
-        limit (int | None): Максимальное количество возвращаемых организаций. По умолчанию None (все организации).
-        db (Session): Сессия базы данных.
+        limit (int): Размер страницы.
+        cursor (str | None): Непрозрачный курсор из `next_cursor` предыдущей страницы.
+        order_by (str): Сортировка: по `id` или по `created_at` (с `id` для однозначности).
+        db (AsyncSession): Сессия базы данных.
     """
-    # Если `limit` задан, применяем ограничение
-    query = db.query(Organization)
-    if limit:
-        query = query.limit(limit)
+    query = keyset_paginate(
+        organizations_select(), order_by, ORGANIZATION_ORDERINGS[order_by], cursor, limit
+    )
     
-    organizations = query.all()
+    result = await db.execute(query)
+    organizations, next_cursor = split_page(
+        result.all(), order_by, ORGANIZATION_ORDER_KEYS[order_by], limit
+    )
 
     # Если организаций нет, возвращаем пустой список
     if not organizations:
-        return JSONResponse(
-            content={"status": True, "data": [], "message": "Организации не найдены"},
+        return ORJSONResponse(
+            content={"status": True, "data": [], "next_cursor": None, "message": "Организации не найдены"},
             status_code=200,
         )
 
-    # Преобразуем объекты в словари (предполагается, что у модели есть метод `to_dict()`)
-    orgs_list = [org.to_dict() for org in organizations]
+    # Преобразуем строки в словари; продукты и услуги подгружаются одним запросом на таблицу
+    orgs_list = await serialize_organizations(db, organizations)
 
-    return JSONResponse(
-        content={"status": True, "data": orgs_list, "message": "Успешно"},
+    return ORJSONResponse(
+        content={"status": True, "data": orgs_list, "next_cursor": next_cursor, "message": "Успешно"},
         status_code=200,
     )
 
 
+async def detail_response(
+    request: Request,
+    db: AsyncSession,
+    cached: Optional[CachedDetail],
+    kind: str,
+    model,
+    where,
+    owner_field: str,
+    children,
+    adapter,
+    not_found: str,
+):
+    """
+    Карточка организации/ИП с ETag и Last-Modified. Попадание в кэш Redis отдаётся
+    без обращения к БД. При промахе условный запрос сначала сверяет лёгкую версию
+    (один запрос без связей) и при совпадении получает 304; иначе карточка
+    загружается целиком и кладётся в кэш.
+    """
+    if cached is not None:
+        headers = validator_headers(cached.etag, cached.last_modified)
+        if not_modified(request, cached.etag, cached.last_modified):
+            return Response(status_code=304, headers=headers)
+        return Response(content=cached.body, media_type="application/json", headers=headers)
+
+    if is_conditional(request):
+        version = await fetch_detail_version(db, model.__table__, owner_field, where)
+        if version is None:
+            raise HTTPException(status_code=404, detail=not_found)
+        if not_modified(request, version.etag, version.last_modified):
+            return Response(status_code=304, headers=validator_headers(version.etag, version.last_modified))
+
+    result = await db.execute(select(model).filter(where).options(*children))
+    obj = result.scalars().first()
+    if not obj:
+        raise HTTPException(status_code=404, detail=not_found)
+    version = loaded_detail_version(obj)
+    response = Response(
+        content=dump_envelope(adapter, obj),
+        media_type="application/json",
+        headers=validator_headers(version.etag, version.last_modified),
+    )
+    await store_detail(
+        kind, obj.id,
+        CachedDetail(response.body, version.etag, version.last_modified, getattr(obj, "ogrn", None)),
+    )
+    return response
+
+
 @router.get("/organizations/by_ogrn/{ogrn}")
-def get_organization_by_ogrn(
+async def get_organization_by_ogrn(
     ogrn: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
 ):
-    
-    org = db.query(Organization).filter(Organization.ogrn == ogrn).first()
-    if not org:
-        raise HTTPException(status_code=404, detail="Организация не найдена")
-    return JSONResponse(
-        content={"status": True, "data": org.to_dict(), "message": "Успешно"},
-        status_code=200,
+    return await detail_response(
+        request, db, await get_cached_organization_by_ogrn(ogrn), ORGANIZATION,
+        Organization, organizations_table.c.ogrn == ogrn, "organization_id",
+        ORGANIZATION_CHILDREN, ORGANIZATION_DETAIL, "Организация не найдена",
     )
 
 
-
 @router.get("/organization/{id}")
-def get_organization_by_id(
+async def get_organization_by_id(
     id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
 ):
-    print("dd")
-    org = db.query(Organization).filter(Organization.id == id).first()
-    if not org:
-        raise HTTPException(status_code=404, detail="Организация не найдена")
-    return JSONResponse(
-        content={"status": True, "data": org.to_dict(), "message": "Успешно"},
-        status_code=200,
+    return await detail_response(
+        request, db, await get_detail(ORGANIZATION, id), ORGANIZATION,
+        Organization, organizations_table.c.id == id, "organization_id",
+        ORGANIZATION_CHILDREN, ORGANIZATION_DETAIL, "Организация не найдена",
     )
 
 
 @router.put("/organizations/{id}", response_model=OrganizationResponse)
-def update_organization(
+async def update_organization(
     id: int,
     org_data: OrganizationUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    org = db.query(Organization).filter(Organization.id == id).first()
-    if not org:
-        raise HTTPException(status_code=404, detail="Организация не найдена")
-    # Проверяем, является ли текущий пользователь владельцем
-    if org.owner_id != current_user.id:
+    # Владелец проверяется в WHERE: обновление и проверка прав — один запрос
+    org = await update_returning(
+        db, organizations_table,
+        (organizations_table.c.id == id, organizations_table.c.owner_id == current_user.id),
+        table_values(organizations_table, org_data.model_dump(exclude_unset=True)),
+        ORGANIZATION_FIELDS,
+    )
+    if org is None:
+        if await fetch_owner_columns(db, organizations_table, id, ("owner_id",)) is None:
+            raise HTTPException(status_code=404, detail="Организация не найдена")
         raise HTTPException(status_code=403, detail="Вы не авторизованы для обновления этой организации")
 
-    for key, value in org_data.dict(exclude_unset=True).items():
-        setattr(org, key, value)
-
-    db.commit()
-    db.refresh(org)
-    return org
+    await db.commit()
+    await invalidate_details(organization_ids=[id])
+    return org._asdict()
 
 @router.delete("/organizations/{id}", response_model=OrganizationResponse)
-def delete_organization(
+async def delete_organization(
     id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    org = db.query(Organization).filter(Organization.id == id).first()
+    result = await db.execute(select(Organization).filter(Organization.id == id))
+    org = result.scalars().first()
     if not org:
         raise HTTPException(status_code=404, detail="Организация не найдена")
     # Проверяем, является ли текущий пользователь владельцем
     if org.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Вы не авторизованы для удаления этой организации")
     
-    db.delete(org)
-    db.commit()
-    return JSONResponse(
+    await db.delete(org)
+    await db.commit()
+    await invalidate_auth_context(current_user.id)
+    await invalidate_details(organization_ids=[id])
+    return ORJSONResponse(
         content={"status": True, "message": "Успешно удалено"},
         status_code=200,
     )
 
 @router.get("/organizations/me")
-def get_organizations_for_current_user(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_organizations_for_current_user(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    organizations = db.query(Organization).filter(Organization.owner_id == current_user.id).all()
+    result = await db.execute(
+        organizations_select()
+        .where(organizations_table.c.owner_id == current_user.id)
+        .order_by(organizations_table.c.id)
+    )
+    organizations = result.all()
     if not organizations:
-        return JSONResponse(
+        return ORJSONResponse(
             content={
                 "status": False,
                 "data": [],  # Возвращаем пустой массив
@@ -430,57 +575,61 @@ def get_organizations_for_current_user(
             status_code=200,
         )
 
-    return JSONResponse(
+    return ORJSONResponse(
         content={
             "status": True,
-            "data": [org.to_dict() for org in organizations],
+            "data": await serialize_organizations(db, organizations),
             "message": "Успешно"
         },
         status_code=200,
     )
 
 
-@router.get("/individual-entrepreneurs", response_model=list[dict])  # Указываем, что возвращаем список словарей
-def get_all_individual_entrepreneurs(limit: int | None = None, db: Session = Depends(get_db)):
+@router.get("/individual-entrepreneurs", response_model=Page[IndividualEntrepreneurDetail])
+async def get_all_individual_entrepreneurs(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+):
     """
-    Получить список индивидуальных предпринимателей с возможным ограничением по количеству.
+    Получить страницу индивидуальных предпринимателей (keyset-пагинация по `id`).
     
     Args:
-        limit (int | None): Максимальное количество возвращаемых предпринимателей. По умолчанию None (все).
-        db (Session): Сессия базы данных.
+        limit (int): Размер страницы.
+        cursor (str | None): Непрозрачный курсор из `next_cursor` предыдущей страницы.
+        db (AsyncSession): Сессия базы данных.
     """
-    # Создаем запрос с возможным ограничением
-    query = db.query(IndividualEntrepreneur)
-    if limit:
-        query = query.limit(limit)
+    query = keyset_paginate(entrepreneurs_select(), "id", (IndividualEntrepreneur.id,), cursor, limit)
     
-    entrepreneurs = query.all()
+    result = await db.execute(query)
+    entrepreneurs, next_cursor = split_page(result.all(), "id", ("id",), limit)
 
     # Если предпринимателей нет, возвращаем пустой список
     if not entrepreneurs:
-        return JSONResponse(
-            content={"status": True, "data": [], "message": "Предприниматели не найдены"},
+        return ORJSONResponse(
+            content={"status": True, "data": [], "next_cursor": None, "message": "Предприниматели не найдены"},
             status_code=200,
         )
 
-    # Преобразуем объекты в словари
-    entrepreneurs_list = [entrepreneur.to_dict() for entrepreneur in entrepreneurs]
+    # Преобразуем строки в словари
+    entrepreneurs_list = await serialize_entrepreneurs(db, entrepreneurs)
 
-    return JSONResponse(
-        content={"status": True, "data": entrepreneurs_list, "message": "Успешно"},
+    return ORJSONResponse(
+        content={"status": True, "data": entrepreneurs_list, "next_cursor": next_cursor, "message": "Успешно"},
         status_code=200,
     )
 
 @router.post("/individual-entrepreneurs/")
-def create_individual_entrepreneur(
+async def create_individual_entrepreneur(
     ie_data: IndividualEntrepreneurCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     # Проверяем, существует ли ИП у текущего пользователя
-    existing_ie_for_user = db.query(IndividualEntrepreneur).filter(IndividualEntrepreneur.owner_id == current_user.id).first()
+    result = await db.execute(select(IndividualEntrepreneur).filter(IndividualEntrepreneur.owner_id == current_user.id))
+    existing_ie_for_user = result.scalars().first()
     if existing_ie_for_user:
-        return JSONResponse(
+        return ORJSONResponse(
             content={
                 "status": False,
                 "message": "Вы уже зарегистрировали индивидуального предпринимателя."
@@ -489,9 +638,10 @@ def create_individual_entrepreneur(
         )
 
     # Проверяем, существует ли предприниматель с таким же ОГРНИП
-    existing_ie_by_ogrnip = db.query(IndividualEntrepreneur).filter(IndividualEntrepreneur.ogrnip == ie_data.ogrnip).first()
+    result = await db.execute(select(IndividualEntrepreneur).filter(IndividualEntrepreneur.ogrnip == ie_data.ogrnip))
+    existing_ie_by_ogrnip = result.scalars().first()
     if existing_ie_by_ogrnip:
-        return JSONResponse(
+        return ORJSONResponse(
             content={
                 "status": False,
                 "message": "Индивидуальный предприниматель с таким ОГРНИП уже существует."
@@ -502,43 +652,41 @@ def create_individual_entrepreneur(
     # Создаём нового индивидуального предпринимателя
     new_ie = IndividualEntrepreneur(**ie_data.model_dump(), owner_id=current_user.id)
     db.add(new_ie)
-    db.commit()
-    db.refresh(new_ie)
+    await db.commit()
+    await invalidate_auth_context(current_user.id)
+    await db.refresh(new_ie, ["services", "products"])
 
-    return JSONResponse(
-        content={
-            "status": True,
-            "data": new_ie.to_dict(),
-            "message": "Индивидуальный предприниматель успешно добавлен."
-        },
+    return Response(
+        content=dump_envelope(ENTREPRENEUR_DETAIL, new_ie, "Индивидуальный предприниматель успешно добавлен."),
+        media_type="application/json",
         status_code=201,
     )
 
 
 @router.get("/individual-entrepreneurs/{id}")
-def get_individual_entrepreneur_by_id(
+async def get_individual_entrepreneur_by_id(
     id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
 ):
-    ie = db.query(IndividualEntrepreneur).filter(IndividualEntrepreneur.id == id).first()
-    if not ie:
-        raise HTTPException(status_code=404, detail="Индивидуальный предприниматель не найден")
-    return JSONResponse(
-        content={"status": True, "data": ie.to_dict(), "message": "Успешно"},
-        status_code=200,
+    return await detail_response(
+        request, db, await get_detail(ENTREPRENEUR, id), ENTREPRENEUR,
+        IndividualEntrepreneur, entrepreneurs_table.c.id == id, "individual_entrepreneur_id",
+        ENTREPRENEUR_CHILDREN, ENTREPRENEUR_DETAIL, "Индивидуальный предприниматель не найден",
     )
 @router.get("/individual-entrepreneur/me")
-def get_individual_entrepreneur_for_user(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_individual_entrepreneur_for_user(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     # Получаем единственного ИП пользователя
-    entrepreneur = db.query(IndividualEntrepreneur).filter(
-        IndividualEntrepreneur.owner_id == current_user.id
-    ).first()
+    result = await db.execute(
+        entrepreneurs_select().where(entrepreneurs_table.c.owner_id == current_user.id)
+    )
+    entrepreneur = result.first()
 
     if not entrepreneur:
-        return JSONResponse(
+        return ORJSONResponse(
             content={
                 "status": False,
                 "data": None,  # Возвращаем None, так как ИП может быть только один
@@ -547,10 +695,10 @@ def get_individual_entrepreneur_for_user(
             status_code=200,
         )
 
-    return JSONResponse(
+    return ORJSONResponse(
         content={
             "status": True,
-            "data": entrepreneur.to_dict(),  # Возвращаем единственного ИП
+            "data": (await serialize_entrepreneurs(db, [entrepreneur]))[0],  # Возвращаем единственного ИП
             "message": "Успешно"
         },
         status_code=200,
@@ -558,27 +706,33 @@ def get_individual_entrepreneur_for_user(
 
 
 @router.put("/individual-entrepreneurs")
-def update_individual_entrepreneur(
+async def update_individual_entrepreneur(
     ie_data: IndividualEntrepreneurUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    # Получаем ИП текущего пользователя
-    ie = db.query(IndividualEntrepreneur).filter(IndividualEntrepreneur.owner_id == current_user.id).first()
-    if not ie:
+    # Обновляем ИП текущего пользователя одним UPDATE ... RETURNING,
+    # исключая `owner_id`, `services` и `products`
+    row = await update_returning(
+        db, entrepreneurs_table, (entrepreneurs_table.c.owner_id == current_user.id,),
+        table_values(
+            entrepreneurs_table,
+            ie_data.model_dump(exclude_unset=True, exclude={"owner_id", "services", "products"}),
+        ),
+        ENTREPRENEUR_FIELDS,
+    )
+    if row is None:
         raise HTTPException(status_code=404, detail="Индивидуальный предприниматель не найден")
 
-    # Обновляем поля, исключая `owner_id`, `services` и `products`
-    for key, value in ie_data.dict(exclude_unset=True, exclude={"owner_id", "services", "products"}).items():
-        setattr(ie, key, value)
+    await db.commit()
+    await invalidate_details(entrepreneur_ids=[row.id])
+    # Продукты и услуги для ответа — по запросу на таблицу
+    ie = (await serialize_entrepreneurs(db, [row]))[0]
 
-    db.commit()
-    db.refresh(ie)
-    
-    return JSONResponse(
+    return ORJSONResponse(
         content={
             "status": True,
-            "data": ie.to_dict(),
+            "data": ie,
             "message": "Индивидуальный предприниматель успешно обновлён"
         },
         status_code=200,
@@ -586,32 +740,43 @@ def update_individual_entrepreneur(
 
 
 @router.delete("/individual-entrepreneurs/{id}", response_model=IndividualEntrepreneurResponse)
-def delete_individual_entrepreneur(
+async def delete_individual_entrepreneur(
     id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    ie = db.query(IndividualEntrepreneur).filter(IndividualEntrepreneur.id == id).first()
+    result = await db.execute(select(IndividualEntrepreneur).filter(IndividualEntrepreneur.id == id))
+    ie = result.scalars().first()
     if not ie:
         raise HTTPException(status_code=404, detail="Индивидуальный предприниматель не найден")
     # Проверяем, является ли текущий пользователь владельцем
     if ie.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Вы не авторизованы для удаления этого предпринимателя")
     
-    db.delete(ie)
-    db.commit()
+    await db.delete(ie)
+    await db.commit()
+    await invalidate_auth_context(current_user.id)
+    await invalidate_details(entrepreneur_ids=[ie.id])
     return ie
 
 @router.get("/suggest/address")
 async def suggest_address(
     query: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    count: int = Query(DADATA_SUGGESTIONS_COUNT, ge=1, le=DADATA_MAX_SUGGESTIONS_COUNT),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     if not query:
         raise HTTPException(status_code=400, detail="Требуется параметр запроса")
 
-    suggestions = get_address_suggestions(query)
+    try:
+        suggestions = await get_address_suggestions(query, count)
+    except SuggestionsUnavailable:
+        raise HTTPException(
+            status_code=503,
+            detail="Сервис подсказок адресов недоступен, повторите попытку позже",
+            headers={"Retry-After": "1"},
+        )
     if not suggestions:
         raise HTTPException(status_code=404, detail="Предложения не найдены")
 
@@ -622,31 +787,23 @@ async def suggest_address(
 
 
 @router.post("/services/")
-def create_service(
+async def create_service(
     service_data: ServiceCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    auth: AuthContext = Depends(get_auth_context),
 ):
     # Проверяем, принадлежит ли организация пользователю
     if service_data.organization_id:
-        organization = db.query(Organization).filter(
-            Organization.id == service_data.organization_id,
-            Organization.owner_id == current_user.id,
-        ).first()
-        if not organization:
-            return JSONResponse(
+        if not auth.owns_organization(service_data.organization_id):
+            return ORJSONResponse(
                 content={"status": False, "message": "Организация не найдена или не принадлежит текущему пользователю"},
                 status_code=status.HTTP_403_FORBIDDEN,
             )
 
     # Проверяем, принадлежит ли индивидуальный предприниматель пользователю
     if service_data.individual_entrepreneur_id:
-        entrepreneur = db.query(IndividualEntrepreneur).filter(
-            IndividualEntrepreneur.id == service_data.individual_entrepreneur_id,
-            IndividualEntrepreneur.owner_id == current_user.id,
-        ).first()
-        if not entrepreneur:
-            return JSONResponse(
+        if not auth.owns_entrepreneur(service_data.individual_entrepreneur_id):
+            return ORJSONResponse(
                 content={"status": False, "message": "ИП не найден или не принадлежит текущему пользователю"},
                 status_code=status.HTTP_403_FORBIDDEN,
             )
@@ -654,84 +811,81 @@ def create_service(
     # Создаем услугу
     new_service = Service(**service_data.dict())
     db.add(new_service)
-    db.commit()
-    db.refresh(new_service)
+    await db.commit()
+    await invalidate_details([new_service.organization_id], [new_service.individual_entrepreneur_id])
+    await db.refresh(new_service)
 
-    return JSONResponse(
-        content={"status": True, "data": new_service.to_dict(), "message": "Услуга успешно создана"},
+    return Response(
+        content=dump_envelope(SERVICE_RESPONSE, new_service, "Услуга успешно создана"),
+        media_type="application/json",
         status_code=status.HTTP_201_CREATED,
     )
 
+@router.post("/services/batch")
+async def create_services_batch(
+    batch: ServiceBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    auth: AuthContext = Depends(get_auth_context),
+):
+    return await create_owned_batch(
+        Service, batch.items, db, auth,
+        created_message="Услуги успешно созданы",
+    )
+
 @router.delete("/services/{id}")
-def delete_service(
+async def delete_service(
     id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    auth: AuthContext = Depends(get_auth_context),
 ):
-    service = db.query(Service).filter(Service.id == id).first()
-    if not service:
-        return JSONResponse(
-            content={"status": False, "message": "Услуга не найдена"},
-            status_code=status.HTTP_404_NOT_FOUND,
-        )
-
-    # Проверяем, имеет ли пользователь право удалить услугу
-    if service.organization_id:
-        organization = db.query(Organization).filter(
-            Organization.id == service.organization_id,
-            Organization.owner_id == current_user.id,
-        ).first()
-        if not organization:
-            return JSONResponse(
-                content={"status": False, "message": "Услуга не принадлежит вашей организации"},
-                status_code=status.HTTP_403_FORBIDDEN,
-            )
-
-    if service.individual_entrepreneur_id:
-        entrepreneur = db.query(IndividualEntrepreneur).filter(
-            IndividualEntrepreneur.id == service.individual_entrepreneur_id,
-            IndividualEntrepreneur.owner_id == current_user.id,
-        ).first()
-        if not entrepreneur:
-            return JSONResponse(
-                content={"status": False, "message": "Услуга не принадлежит вашему ИП"},
-                status_code=status.HTTP_403_FORBIDDEN,
+    # Удаление и проверка прав одним DELETE ... RETURNING
+    deleted = await delete_returning(
+        db, services_table, (services_table.c.id == id, owned_child_filter(services_table, auth)),
+        ("id", "organization_id", "individual_entrepreneur_id"),
+    )
+    if deleted is None:
+        owner = await fetch_owner_columns(db, services_table, id, ("organization_id",))
+        if owner is None:
+            return ORJSONResponse(
+                content={"status": False, "message": "Услуга не найдена"},
+                status_code=status.HTTP_404_NOT_FOUND,
             )
+        if owner.organization_id and not auth.owns_organization(owner.organization_id):
+            message = "Услуга не принадлежит вашей организации"
+        else:
+            message = "Услуга не принадлежит вашему ИП"
+        return ORJSONResponse(
+            content={"status": False, "message": message},
+            status_code=status.HTTP_403_FORBIDDEN,
+        )
 
-    db.delete(service)
-    db.commit()
+    await touch_owners(db, deleted.organization_id, deleted.individual_entrepreneur_id)
+    await db.commit()
+    await invalidate_details([deleted.organization_id], [deleted.individual_entrepreneur_id])
 
-    return JSONResponse(
+    return ORJSONResponse(
         content={"status": True, "message": "Услуга успешно удалена"},
         status_code=status.HTTP_200_OK,
     )
 
 # --- Product CRUD Operations ---
 @router.post("/products/")
-def create_product(
+async def create_product(
     product_data: ProductCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    auth: AuthContext = Depends(get_auth_context),
 ):
     # Проверяем права пользователя
     if product_data.organization_id:
-        organization = db.query(Organization).filter(
-            Organization.id == product_data.organization_id,
-            Organization.owner_id == current_user.id,
-        ).first()
-        if not organization:
-            return JSONResponse(
+        if not auth.owns_organization(product_data.organization_id):
+            return ORJSONResponse(
                 content={"status": False, "message": "Организация не найдена или не принадлежит текущему пользователю"},
                 status_code=status.HTTP_403_FORBIDDEN,
             )
 
     if product_data.individual_entrepreneur_id:
-        entrepreneur = db.query(IndividualEntrepreneur).filter(
-            IndividualEntrepreneur.id == product_data.individual_entrepreneur_id,
-            IndividualEntrepreneur.owner_id == current_user.id,
-        ).first()
-        if not entrepreneur:
-            return JSONResponse(
+        if not auth.owns_entrepreneur(product_data.individual_entrepreneur_id):
+            return ORJSONResponse(
                 content={"status": False, "message": "ИП не найден или не принадлежит текущему пользователю"},
                 status_code=status.HTTP_403_FORBIDDEN,
             )
@@ -739,54 +893,107 @@ def create_product(
     # Создание продукта
     new_product = Product(**product_data.dict())
     db.add(new_product)
-    db.commit()
-    db.refresh(new_product)
+    await db.commit()
+    await invalidate_details([new_product.organization_id], [new_product.individual_entrepreneur_id])
+    await db.refresh(new_product)
 
-    return JSONResponse(
-        content={"status": True, "data": new_product.to_dict(), "message": "Продукт успешно создан"},
+    return Response(
+        content=dump_envelope(PRODUCT_RESPONSE, new_product, "Продукт успешно создан"),
+        media_type="application/json",
         status_code=status.HTTP_201_CREATED,
     )
 
+@router.post("/products/batch")
+async def create_products_batch(
+    batch: ProductBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    auth: AuthContext = Depends(get_auth_context),
+):
+    return await create_owned_batch(
+        Product, batch.items, db, auth,
+        created_message="Продукты успешно созданы",
+    )
+
 @router.delete("/products/{id}")
-def delete_product(
+async def delete_product(
     id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    auth: AuthContext = Depends(get_auth_context),
 ):
-    product = db.query(Product).filter(Product.id == id).first()
-    if not product:
-        return JSONResponse(
-            content={"status": False, "message": "Продукт не найден"},
-            status_code=status.HTTP_404_NOT_FOUND,
-        )
-
-    # Проверяем, имеет ли пользователь право удалить продукт
-    if product.organization_id:
-        organization = db.query(Organization).filter(
-            Organization.id == product.organization_id,
-            Organization.owner_id == current_user.id,
-        ).first()
-        if not organization:
-            return JSONResponse(
-                content={"status": False, "message": "Продукт не принадлежит вашей организации"},
-                status_code=status.HTTP_403_FORBIDDEN,
-            )
-
-    if product.individual_entrepreneur_id:
-        entrepreneur = db.query(IndividualEntrepreneur).filter(
-            IndividualEntrepreneur.id == product.individual_entrepreneur_id,
-            IndividualEntrepreneur.owner_id == current_user.id,
-        ).first()
-        if not entrepreneur:
-            return JSONResponse(
-                content={"status": False, "message": "Продукт не принадлежит вашему ИП"},
-                status_code=status.HTTP_403_FORBIDDEN,
+    # Удаление и проверка прав одним DELETE ... RETURNING
+    deleted = await delete_returning(
+        db, products_table, (products_table.c.id == id, owned_child_filter(products_table, auth)),
+        ("id", "organization_id", "individual_entrepreneur_id"),
+    )
+    if deleted is None:
+        owner = await fetch_owner_columns(db, products_table, id, ("organization_id",))
+        if owner is None:
+            return ORJSONResponse(
+                content={"status": False, "message": "Продукт не найден"},
+                status_code=status.HTTP_404_NOT_FOUND,
             )
+        if owner.organization_id and not auth.owns_organization(owner.organization_id):
+            message = "Продукт не принадлежит вашей организации"
+        else:
+            message = "Продукт не принадлежит вашему ИП"
+        return ORJSONResponse(
+            content={"status": False, "message": message},
+            status_code=status.HTTP_403_FORBIDDEN,
+        )
 
-    db.delete(product)
-    db.commit()
+    await touch_owners(db, deleted.organization_id, deleted.individual_entrepreneur_id)
+    await db.commit()
+    await invalidate_details([deleted.organization_id], [deleted.individual_entrepreneur_id])
 
-    return JSONResponse(
+    return ORJSONResponse(
         content={"status": True, "message": "Продукт успешно удален"},
         status_code=status.HTTP_200_OK,
-    )
\ No newline at end of file
+    )
+
+
+async def create_owned_batch(model, items, db: AsyncSession, auth: AuthContext, created_message: str):
+    """
+    Пакетно создаёт продукты или услуги.
+
+    Владение проверяется по контексту авторизации, без запросов к БД; строки вставляются
+    одним многострочным INSERT ... RETURNING в одной транзакции. Если хотя бы один элемент
+    не проходит проверку, ничего не создаётся, а в ответе перечисляются ошибки с индексами элементов.
+    """
+    errors = []
+    for index, item in enumerate(items):
+        if item.organization_id and not auth.owns_organization(item.organization_id):
+            errors.append({
+                "index": index,
+                "field": "organization_id",
+                "message": "Организация не найдена или не принадлежит текущему пользователю",
+            })
+        if item.individual_entrepreneur_id and not auth.owns_entrepreneur(item.individual_entrepreneur_id):
+            errors.append({
+                "index": index,
+                "field": "individual_entrepreneur_id",
+                "message": "ИП не найден или не принадлежит текущему пользователю",
+            })
+    if errors:
+        return ORJSONResponse(
+            content={"status": False, "errors": errors, "message": "Пакет не создан: есть ошибки в элементах"},
+            status_code=status.HTTP_403_FORBIDDEN,
+        )
+
+    table = model.__table__
+    result = await db.execute(
+        insert(table).returning(
+            *(table.c[field] for field in CHILD_FIELDS), sort_by_parameter_order=True
+        ),
+        [item.model_dump() for item in items],
+    )
+    created = [serialize_child(row) for row in result.mappings()]
+    await db.commit()
+    await invalidate_details(
+        (item.organization_id for item in items),
+        (item.individual_entrepreneur_id for item in items),
+    )
+
+    return ORJSONResponse(
+        content={"status": True, "data": created, "message": created_message},
+        status_code=status.HTTP_201_CREATED,
+    )
@@ -0,0 +1,49 @@
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_read_db
+from ..search import SEARCH_KINDS, search_statement
+
+search = APIRouter()
+
+MAX_SEARCH_LIMIT = 100
+# Глубокие смещения по ранжированной выдаче бессмысленны и дороги
+MAX_SEARCH_OFFSET = 1000
+
+
+@search.get("/search")
+async def search_catalog(
+    q: str = Query(..., min_length=2, max_length=200),
+    kind: Optional[List[Literal["organization", "product", "service"]]] = Query(None),
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_LIMIT),
+    offset: int = Query(0, ge=0, le=MAX_SEARCH_OFFSET),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Полнотекстовый поиск по организациям, продуктам и услугам.
+
+    Args:
+        q (str): Поисковая строка (синтаксис websearch: фразы в кавычках, `-` для исключения).
+        kind (list[str] | None): Ограничить типами сущностей. По умолчанию ищем везде.
+        limit (int): Размер страницы.
+        offset (int): Смещение; следующее значение приходит в `next_offset`.
+        db (AsyncSession): Сессия базы данных.
+    """
+    kinds = [k for k in SEARCH_KINDS if k in kind] if kind else SEARCH_KINDS
+    result = await db.execute(search_statement(q, kinds, limit, offset))
+    rows = result.mappings().all()
+
+    next_offset = offset + limit if len(rows) > limit else None
+    data = [dict(row) for row in rows[:limit]]
+
+    return ORJSONResponse(
+        content={
+            "status": True,
+            "data": data,
+            "next_offset": next_offset,
+            "message": "Успешно" if data else "Ничего не найдено",
+        },
+        status_code=200,
+    )
@@ -1,5 +1,7 @@
-from typing import Optional, List
-from pydantic import BaseModel, Field, EmailStr
+from datetime import datetime
+from typing import Generic, Optional, List, TypeVar
+import orjson
+from pydantic import BaseModel, ConfigDict, Field, EmailStr, TypeAdapter
 
 class UserCreate(BaseModel):
     name: Optional[str]  # Имя может быть необязательным
@@ -62,8 +64,7 @@ class OrganizationResponse(BaseModel):
     logo_url: Optional[str] = None
     city: Optional[str] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class IndividualEntrepreneurUpdate(BaseModel):
@@ -81,8 +82,7 @@ class IndividualEntrepreneurResponse(BaseModel):
     phone: Optional[str] = None
     owner_id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ServiceCreate(BaseModel):
@@ -93,13 +93,19 @@ class ServiceCreate(BaseModel):
     individual_entrepreneur_id: Optional[int] = Field(None, title="ID ИП, к которому привязана услуга")
 
 
-class ServiceResponse(ServiceCreate):
+class ServiceResponse(BaseModel):
+    # Без ограничений длины из ServiceCreate: ответ отражает то, что уже лежит в БД
     id: int = Field(..., title="ID услуги")
-    created_at: Optional[str] = Field(None, title="Дата создания")
-    updated_at: Optional[str] = Field(None, title="Дата последнего обновления")
+    name: str = Field(..., title="Название услуги")
+    description: Optional[str] = Field(None, title="Описание услуги")
+    price: Optional[float] = Field(None, title="Цена услуги")
+    created_at: Optional[datetime] = Field(None, title="Дата создания")
+    updated_at: Optional[datetime] = Field(None, title="Дата последнего обновления")
+    organization_id: Optional[int] = Field(None, title="ID организации")
+    individual_entrepreneur_id: Optional[int] = Field(None, title="ID ИП")
+    category_id: Optional[int] = Field(None, title="ID категории")
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ProductCreate(BaseModel):
     name: str = Field(..., title="Название продукта", max_length=255)
@@ -108,10 +114,83 @@ class ProductCreate(BaseModel):
     organization_id: Optional[int] = Field(None, title="ID организации, к которой привязан продукт")
     individual_entrepreneur_id: Optional[int] = Field(None, title="ID ИП, к которому привязан продукт")
 
-class ProductResponse(ProductCreate):
+class ProductResponse(BaseModel):
+    # Без ограничений длины из ProductCreate: ответ отражает то, что уже лежит в БД
     id: int = Field(..., title="ID продукта")
-    created_at: Optional[str] = Field(None, title="Дата создания")
-    updated_at: Optional[str] = Field(None, title="Дата последнего обновления")
+    name: str = Field(..., title="Название продукта")
+    description: Optional[str] = Field(None, title="Описание продукта")
+    price: Optional[float] = Field(None, title="Цена продукта")
+    created_at: Optional[datetime] = Field(None, title="Дата создания")
+    updated_at: Optional[datetime] = Field(None, title="Дата последнего обновления")
+    organization_id: Optional[int] = Field(None, title="ID организации")
+    individual_entrepreneur_id: Optional[int] = Field(None, title="ID ИП")
+    category_id: Optional[int] = Field(None, title="ID категории")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class OrganizationDetail(OrganizationResponse):
+    """Организация с продуктами и услугами — в формате `Organization.to_dict()`."""
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    owner_id: int
+    services: List[ServiceResponse] = []
+    products: List[ProductResponse] = []
+
+
+class IndividualEntrepreneurDetail(BaseModel):
+    """ИП с продуктами и услугами — в формате `IndividualEntrepreneur.to_dict()`."""
+    id: int
+    name: Optional[str] = None
+    inn: str
+    ogrnip: str
+    phone: Optional[str] = None
+    owner_id: int
+    services: List[ServiceResponse] = []
+    products: List[ProductResponse] = []
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+T = TypeVar("T")
+
+
+class Envelope(BaseModel, Generic[T]):
+    """Обёртка ответов API: `{"status", "data", "message"}`."""
+    status: bool
+    data: T
+    message: str
+
+
+class Page(Envelope[List[T]], Generic[T]):
+    """Страница keyset-пагинации: `next_cursor` — None на последней странице."""
+    next_cursor: Optional[str] = None
+
+
+class CategoryOption(BaseModel):
+    key: int
+    value: str
+
+
+# Ответы с ORM-объектами: атрибуты читает pydantic-core, JSON пишет orjson — как
+# у списков, поэтому даты везде в одном формате (`+00:00`, а не `Z` из dump_json)
+ORGANIZATION_DETAIL = TypeAdapter(Envelope[OrganizationDetail])
+ENTREPRENEUR_DETAIL = TypeAdapter(Envelope[IndividualEntrepreneurDetail])
+PRODUCT_RESPONSE = TypeAdapter(Envelope[ProductResponse])
+SERVICE_RESPONSE = TypeAdapter(Envelope[ServiceResponse])
+
+
+def dump_envelope(adapter: TypeAdapter, obj, message: str = "Успешно") -> bytes:
+    """Готовое тело ответа `{"status": true, "data": obj, "message": message}` из ORM-объекта."""
+    envelope = adapter.validate_python({"status": True, "data": obj, "message": message}, from_attributes=True)
+    return orjson.dumps(adapter.dump_python(envelope))
+
+
+# Пакетное создание: за один запрос и одну транзакцию
+BATCH_MAX_ITEMS = 2000
+
+class ProductBatchCreate(BaseModel):
+    items: List[ProductCreate] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS, title="Продукты")
 
-    class Config:
-        orm_mode = True
+class ServiceBatchCreate(BaseModel):
+    items: List[ServiceCreate] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS, title="Услуги")
@@ -0,0 +1,69 @@
+"""
+Полнотекстовый поиск по организациям, продуктам и услугам (PostgreSQL, конфигурация russian).
+
+Колонки `search_vector` заполняет триггер в базе (см. миграцию 34cc8b635513) и не
+описаны в ORM-моделях, поэтому здесь используются лёгкие описания таблиц.
+"""
+from typing import Sequence
+
+from sqlalchemy import Integer, String, cast, column, func, literal_column, null, select, table, union_all
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+SEARCH_CONFIG = literal_column("'russian'::regconfig")
+
+
+def _searchable(name: str, *owner_columns: str):
+    return table(
+        name,
+        column("id", Integer),
+        column("name", String),
+        column("description", String),
+        column("search_vector", TSVECTOR),
+        *(column(owner_column, Integer) for owner_column in owner_columns),
+    )
+
+
+SEARCH_TABLES = {
+    "organization": _searchable("organizations_models"),
+    "product": _searchable("products_models", "organization_id", "individual_entrepreneur_id"),
+    "service": _searchable("services_models", "organization_id", "individual_entrepreneur_id"),
+}
+SEARCH_KINDS = tuple(SEARCH_TABLES)
+
+
+def _owner_column(searchable, name: str):
+    if name in searchable.c:
+        return searchable.c[name]
+    return cast(null(), Integer).label(name)
+
+
+def search_statement(q: str, kinds: Sequence[str], limit: int, offset: int):
+    """
+    Запрос ранжированного поиска: по ветке UNION ALL на каждый тип сущности.
+
+    Каждая ветка фильтруется по GIN-индексу (`search_vector @@ query`), ранжирование
+    `ts_rank_cd` учитывает веса (название A, описание B). Выбирается limit + 1 строка,
+    чтобы понять, есть ли следующая страница.
+    """
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    branches = []
+    for kind in kinds:
+        searchable = SEARCH_TABLES[kind]
+        branches.append(
+            select(
+                literal_column(f"'{kind}'").label("kind"),
+                searchable.c.id,
+                searchable.c.name,
+                searchable.c.description,
+                _owner_column(searchable, "organization_id").label("organization_id"),
+                _owner_column(searchable, "individual_entrepreneur_id").label("individual_entrepreneur_id"),
+                func.ts_rank_cd(searchable.c.search_vector, query).label("rank"),
+            ).where(searchable.c.search_vector.op("@@")(query))
+        )
+    results = union_all(*branches).subquery("results")
+    return (
+        select(results)
+        .order_by(results.c.rank.desc(), results.c.kind, results.c.id)
+        .limit(limit + 1)
+        .offset(offset)
+    )
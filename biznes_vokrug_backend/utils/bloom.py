@@ -0,0 +1,32 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Фильтр Блума по строкам: «точно нет» или «возможно, есть».
+
+    Размер и число хэш-функций подбираются по ожидаемому числу элементов и
+    допустимой доле ложных срабатываний; k индексов получаются двойным хэшированием
+    из одного sha256.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _indexes(self, item: str):
+        digest = hashlib.sha256(item.encode()).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str):
+        for index in self._indexes(item):
+            self._bits[index >> 3] |= 1 << (index & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[index >> 3] & (1 << (index & 7)) for index in self._indexes(item))
@@ -0,0 +1,75 @@
+import threading
+import time
+
+from .metrics import Counter
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Предохранитель для необязательной зависимости (кэша).
+
+    После failure_threshold ошибок подряд размыкается: `allow()` reset_timeout секунд
+    сразу возвращает False, и вызывающий обходится без зависимости, не тратя время
+    на таймауты. Затем пропускает один пробный вызов: успех замыкает цепь, ошибка
+    снова размыкает её. Если проба не сообщила результат за reset_timeout (например,
+    её отменили), пропускается следующая — иначе цепь застряла бы полуоткрытой.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at = 0.0
+        self._lock = threading.Lock()
+        self.short_circuited = Counter()
+        self.failures = Counter()
+        self.opened = Counter()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            now = time.monotonic()
+            if self.state == OPEN and now - self._opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._probe_started_at = now
+                return True
+            if self.state == HALF_OPEN and now - self._probe_started_at >= self.reset_timeout:
+                self._probe_started_at = now
+                return True
+        self.short_circuited.inc()
+        return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> bool:
+        """Учитывает ошибку; True, если цепь только что разомкнулась."""
+        self.failures.inc()
+        with self._lock:
+            self._failures += 1
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                opened_now = self.state != OPEN
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                if opened_now:
+                    self.opened.inc()
+                return opened_now
+        return False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "failures": self.failures.value,
+            "opened": self.opened.value,
+            "short_circuited": self.short_circuited.value,
+        }
@@ -0,0 +1,57 @@
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Карточки можно хранить, но перед показом нужно сверить версию (ответ 304 — дешёвый)
+REVALIDATE = "no-cache"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Слабое сравнение для If-None-Match (RFC 9110): `*` или любой из перечисленных ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == bare for candidate in if_none_match.split(","))
+
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """
+    Есть ли у клиента актуальная версия. If-Modified-Since учитывается, только
+    если нет If-None-Match: ETag точнее (секундная точность дат его не обманывает).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    return last_modified.replace(microsecond=0) <= since
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime], cache_control: str = REVALIDATE) -> dict:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def cached_json_response(request: Request, body: bytes, etag: str, cache_control: str) -> Response:
+    """Готовое JSON-тело с ETag; если у клиента та же версия — 304 без тела."""
+    headers = validator_headers(etag, None, cache_control)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
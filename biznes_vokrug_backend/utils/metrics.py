@@ -0,0 +1,56 @@
+import bisect
+import threading
+
+
+class Counter:
+    """Простой потокобезопасный счётчик для служебной статистики."""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин (в стиле Prometheus, накопительная)."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            if value > self._max:
+                self._max = value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total_sum = self._sum
+            max_value = self._max
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            buckets[f"le_{bound:g}"] = cumulative
+        cumulative += counts[-1]
+        buckets["le_inf"] = cumulative
+        return {
+            "buckets": buckets,
+            "count": cumulative,
+            "sum": round(total_sum, 6),
+            "max": round(max_value, 6),
+        }
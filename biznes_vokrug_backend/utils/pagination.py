@@ -0,0 +1,75 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import DateTime, Integer, String, tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(order: str, values: Sequence) -> str:
+    """Упаковывает значения ключа сортировки последней строки в непрозрачный токен."""
+    payload = {
+        "o": order,
+        "v": [value.isoformat() if isinstance(value, datetime) else value for value in values],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _coerce(column, value):
+    """Приводит значение из курсора к типу колонки; чужой тип — ValueError."""
+    if isinstance(column.type, DateTime):
+        if not isinstance(value, str):
+            raise ValueError("datetime expected")
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, Integer):
+        # bool — подкласс int, но в курсоре ему взяться неоткуда
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise ValueError("integer expected")
+        return value
+    if isinstance(column.type, String) and isinstance(value, str):
+        return value
+    raise ValueError("unexpected cursor value")
+
+
+def decode_cursor(token: str, order: str, columns: Sequence) -> list:
+    """Распаковывает токен курсора; курсор должен относиться к той же сортировке."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        values = payload["v"]
+        if payload["o"] != order or len(values) != len(columns):
+            raise ValueError("cursor does not match ordering")
+        if not isinstance(values, list):
+            raise ValueError("cursor values must be a list")
+        return [_coerce(column, value) for column, value in zip(columns, values)]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Неверный курсор пагинации")
+
+
+def keyset_paginate(query, order: str, columns: Sequence, cursor: Optional[str], limit: int):
+    """
+    Добавляет к запросу условие «после курсора», сортировку и лимит.
+
+    Выбирается на одну строку больше страницы, чтобы без COUNT понять, есть ли продолжение.
+    """
+    if cursor:
+        values = decode_cursor(cursor, order, columns)
+        if len(columns) == 1:
+            query = query.where(columns[0] > values[0])
+        else:
+            query = query.where(tuple_(*columns) > tuple_(*values))
+    return query.order_by(*columns).limit(limit + 1)
+
+
+def split_page(rows: Sequence, order: str, keys: Sequence[str], limit: int):
+    """Обрезает лишнюю строку и возвращает (строки страницы, next_cursor)."""
+    if len(rows) <= limit:
+        return list(rows), None
+    page = list(rows[:limit])
+    last = page[-1]
+    return page, encode_cursor(order, [getattr(last, key) for key in keys])
@@ -0,0 +1,125 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from .metrics import Counter
+
+# Новые хэши — argon2; bcrypt остаётся для проверки старых паролей и помечен
+# устаревшим, поэтому при успешном входе такой хэш пересчитывается в argon2
+pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
+
+# Сколько процессов считает хэши паролей (на один воркер приложения)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+# Сколько задач может ждать свободный процесс; сверх этого запрос сразу получает 503
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", 32))
+
+HASH_REJECTED = Counter()
+HASH_REHASHED = Counter()
+HASH_POOL_RESTARTS = Counter()
+
+_executor: Optional[ProcessPoolExecutor] = None
+_in_flight = 0
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str):
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+def hash_executor() -> ProcessPoolExecutor:
+    # Хэширование намеренно медленное, а бэкенды passlib для bcrypt (os_crypt, builtin)
+    # не отпускают GIL: в пуле потоков оно всё равно останавливает цикл событий, поэтому — процессы.
+    # Процессы запускаются через spawn, а не fork: копия работающего воркера унесла бы
+    # в дочерний процесс цикл событий, соединения пулов БД/Redis и захваченные потоками блокировки
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS, mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    """Убирает сломанный пул (умер дочерний процесс), следующий вызов создаст новый."""
+    global _executor
+    # Пул мог уже пересоздать другой запрос, упавший на том же сломанном пуле
+    if _executor is executor:
+        _executor = None
+        HASH_POOL_RESTARTS.inc()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_hash_executor() -> None:
+    """Останавливает процессы хэширования; вызывается при остановке приложения."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+async def _run(func, *args):
+    """
+    Выполняет func в пуле процессов. Если пул и очередь заняты, не ждёт, а сразу
+    отвечает 503: всплеск входов не должен копить задачи и держать соединения остального API.
+    """
+    global _in_flight
+    if _in_flight >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE:
+        HASH_REJECTED.inc()
+        raise HTTPException(
+            status_code=503,
+            detail="Сервис авторизации перегружен, повторите попытку позже",
+            headers={"Retry-After": "1"},
+        )
+    _in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        executor = hash_executor()
+        try:
+            return await loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            # Иначе все следующие входы и регистрации на этом воркере падали бы навсегда
+            _discard_executor(executor)
+            return await loop.run_in_executor(hash_executor(), func, *args)
+    finally:
+        _in_flight -= 1
+
+
+async def hash_password(password: str) -> str:
+    """Хэш пароля в отдельном процессе, не блокируя цикл событий."""
+    return await _run(_hash, password)
+
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    valid, _ = await verify_and_update_password(password, hashed_password)
+    return valid
+
+
+async def verify_and_update_password(password: str, hashed_password: str):
+    """
+    Проверяет пароль. Возвращает (valid, new_hash): new_hash не None, если хэш
+    устарел (bcrypt или старые параметры) и его стоит сохранить вместо прежнего.
+    """
+    valid, new_hash = await _run(_verify_and_update, password, hashed_password)
+    if new_hash:
+        HASH_REHASHED.inc()
+    return valid, new_hash
+
+
+def get_hashing_stats() -> dict:
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "queue": PASSWORD_HASH_QUEUE,
+        "in_flight": _in_flight,
+        "rejected": HASH_REJECTED.value,
+        "rehashed": HASH_REHASHED.value,
+        "pool_restarts": HASH_POOL_RESTARTS.value,
+    }
@@ -0,0 +1,106 @@
+import logging
+import os
+from typing import Any, Awaitable, Callable, Optional
+
+import orjson
+import redis.asyncio as redis
+from redis.asyncio.retry import Retry
+from redis.backoff import NoBackoff
+from dotenv import load_dotenv
+
+from .circuit_breaker import CircuitBreaker
+
+load_dotenv()
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+REDIS_DB = int(os.getenv("REDIS_DB", 0))
+REDIS_PASSWORD = os.getenv("REDIS_PASSWORD") or None
+# Соединений на воркер; сверх этого запрос ждёт не дольше REDIS_POOL_TIMEOUT
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", 0.5))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 0.5))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", 0.5))
+REDIS_BREAKER_FAILURES = int(os.getenv("REDIS_BREAKER_FAILURES", 5))
+REDIS_BREAKER_RESET_SECONDS = float(os.getenv("REDIS_BREAKER_RESET_SECONDS", 10))
+
+logger = logging.getLogger(__name__)
+
+# Общий пул соединений воркера для кэшей, отзыва токенов и версий справочников
+redis_pool = redis.BlockingConnectionPool(
+    host=REDIS_HOST,
+    port=REDIS_PORT,
+    db=REDIS_DB,
+    password=REDIS_PASSWORD,
+    max_connections=REDIS_MAX_CONNECTIONS,
+    timeout=REDIS_POOL_TIMEOUT,
+    socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+    socket_timeout=REDIS_SOCKET_TIMEOUT,
+    # Без повторов: при недоступном Redis запрос сразу идёт в БД
+    retry=Retry(NoBackoff(), 0),
+    health_check_interval=30,
+)
+# Асинхронный клиент для кэшей приложения. Redis здесь не источник истины:
+# любая ошибка соединения означает промах кэша, а не ошибку запроса.
+redis_client = redis.Redis(connection_pool=redis_pool)
+
+# Пока Redis сбоит, кэши обходят его сразу, а не ждут таймаут на каждом запросе
+redis_breaker = CircuitBreaker(REDIS_BREAKER_FAILURES, REDIS_BREAKER_RESET_SECONDS)
+
+
+async def redis_call(
+    description: str,
+    func: Callable[..., Awaitable[Any]],
+    *args,
+    default: Any = None,
+    force: bool = False,
+    **kwargs,
+) -> Any:
+    """
+    Вызов Redis для кэша: при ошибке или разомкнутом предохранителе возвращает default.
+    force=True — пробовать даже при разомкнутом предохранителе (сброс кэша после
+    записи: лучше потратить таймаут, чем оставить устаревшие данные).
+    """
+    if not redis_breaker.allow() and not force:
+        return default
+    succeeded = False
+    try:
+        result = await func(*args, **kwargs)
+        succeeded = True
+        return result
+    except redis.RedisError as e:
+        logger.warning("Redis недоступен (%s): %s", description, e)
+        return default
+    finally:
+        # Любой исход, кроме успеха (в том числе отмена или чужое исключение,
+        # которое уходит выше), — ошибка: иначе проба оставила бы цепь полуоткрытой
+        if succeeded:
+            redis_breaker.record_success()
+        elif redis_breaker.record_failure():
+            logger.warning("Кэши работают без Redis %s с", REDIS_BREAKER_RESET_SECONDS)
+
+
+async def cache_get_json(key: str) -> Optional[Any]:
+    """Значение из Redis, разобранное из JSON; None при промахе или недоступном Redis."""
+    cached = await redis_call(f"чтение {key}", redis_client.get, key)
+    return orjson.loads(cached) if cached is not None else None
+
+
+async def cache_set_json(key: str, value: Any, ttl: int) -> None:
+    await redis_call(f"запись {key}", redis_client.set, key, orjson.dumps(value), ex=ttl)
+
+
+async def cache_delete(*keys: str) -> None:
+    await redis_call(f"удаление {keys}", redis_client.delete, *keys, force=True)
+
+
+async def close_redis() -> None:
+    await redis_pool.disconnect()
+
+
+def get_redis_stats() -> dict:
+    return {
+        "host": REDIS_HOST,
+        "db": REDIS_DB,
+        "max_connections": REDIS_MAX_CONNECTIONS,
+        "breaker": redis_breaker.stats(),
+    }
@@ -1,39 +1,163 @@
-import redis
-import json
-import requests
+"""
+Подсказки адресов DaData с кэшем в Redis.
+
+Запросы к DaData идут через один httpx.AsyncClient на воркер: соединения
+(TCP + TLS) переиспользуются, число одновременных соединений ограничено
+DADATA_MAX_CONNECTIONS, а на каждый этап запроса есть таймаут. Одинаковые запросы,
+пришедшие одновременно (пользователь печатает, фронтенд шлёт одно и то же),
+объединяются: к DaData уходит один запрос, остальные ждут его результат.
+
+Кэш двухуровневый: LRU в памяти воркера перед Redis. Ключ строится по
+нормализованному запросу (регистр, пробелы, ё/е) и числу подсказок. Пустой ответ
+кэшируется на короткий срок, а ошибка DaData запоминается только в памяти
+воркера на несколько секунд, чтобы не долбить недоступный сервис.
+"""
+import asyncio
+import logging
 import os
+import re
+from typing import Optional
+
+import httpx
 from dotenv import load_dotenv
 
+from .lru import TTLCache
+from .metrics import Counter
+from .redis_client import cache_get_json, cache_set_json
+
 load_dotenv()
-REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
-REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 DADATA_API_KEY = os.getenv("DADATA_API_KEY")
 DADATA_URL = "https://suggestions.dadata.ru/suggestions/api/4_1/rs/suggest/address"
+DADATA_SUGGESTIONS_COUNT = 5
+DADATA_MAX_SUGGESTIONS_COUNT = 20  # предел API DaData
+DADATA_CACHE_TTL = 86400
+# Пустой ответ может стать непустым (опечатку исправили в справочнике), поэтому недолго
+DADATA_NEGATIVE_TTL = int(os.getenv("DADATA_NEGATIVE_TTL", 300))
+DADATA_FAILURE_TTL = float(os.getenv("DADATA_FAILURE_TTL", 5))
+DADATA_LOCAL_CACHE_SIZE = int(os.getenv("DADATA_LOCAL_CACHE_SIZE", 10000))
+DADATA_LOCAL_CACHE_TTL = float(os.getenv("DADATA_LOCAL_CACHE_TTL", 300))
+# Подсказки нужны, пока пользователь печатает: дольше ждать бессмысленно
+DADATA_TIMEOUT = float(os.getenv("DADATA_TIMEOUT", 2.0))
+DADATA_CONNECT_TIMEOUT = float(os.getenv("DADATA_CONNECT_TIMEOUT", 1.0))
+DADATA_MAX_CONNECTIONS = int(os.getenv("DADATA_MAX_CONNECTIONS", 10))
 
-# redis_client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=0)
-redis_client = redis.Redis(host="localhost", port=6379, db=0)
-
-def get_address_suggestions(query: str):
-    # Проверка в кэше Redis
-    cached_result = redis_client.get(query)
-    if cached_result:
-        print("cached")
-        # Декодируем байтовую строку из Redis и парсим JSON
-        decoded_result = cached_result.decode("utf-8")
-        return json.loads(decoded_result)
-
-    # Запрос к DaData
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Token {DADATA_API_KEY}"
-    }
-    data = {"query": query, "count": 5}
-    response = requests.post(DADATA_URL, json=data, headers=headers)
-    print("ddd")
-    if response.status_code == 200:
-        suggestions = response.json().get("suggestions", [])
-        # Сохранение в Redis на 1 день
-        redis_client.setex(query, 86400, json.dumps(suggestions))
-        return suggestions
-    else:
+logger = logging.getLogger(__name__)
+
+UPSTREAM_REQUESTS = Counter()
+UPSTREAM_ERRORS = Counter()
+COALESCED = Counter()
+
+LOCAL_CACHE = TTLCache(DADATA_LOCAL_CACHE_SIZE, DADATA_LOCAL_CACHE_TTL)
+# Значение в LOCAL_CACHE: DaData недавно не ответила на этот запрос
+FAILED = object()
+
+_client: Optional[httpx.AsyncClient] = None
+# Запросы к DaData, которые сейчас выполняются, по ключу кэша
+_in_flight: dict = {}
+
+
+class SuggestionsUnavailable(Exception):
+    """DaData не ответила вовремя или ответила ошибкой."""
+
+
+def dadata_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            headers={"Authorization": f"Token {DADATA_API_KEY}"},
+            # pool — сколько ждать свободное соединение, когда все DADATA_MAX_CONNECTIONS заняты
+            timeout=httpx.Timeout(DADATA_TIMEOUT, connect=DADATA_CONNECT_TIMEOUT, pool=DADATA_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=DADATA_MAX_CONNECTIONS,
+                max_keepalive_connections=DADATA_MAX_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+async def close_dadata_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """«  Москва,  Тверская » и «москва, тверская» — один и тот же запрос для кэша и DaData."""
+    return _WHITESPACE.sub(" ", query).strip().lower().replace("ё", "е")
+
+
+def cache_key(query: str, count: int) -> str:
+    """Ключ для уже нормализованного запроса; `v1` — версия формата ключа."""
+    return f"dadata:address:v1:{count}:{query}"
+
+
+async def fetch_address_suggestions(query: str, count: int, key: str) -> list:
+    UPSTREAM_REQUESTS.inc()
+    try:
+        response = await dadata_client().post(DADATA_URL, json={"query": query, "count": count})
+        response.raise_for_status()
+        # Прокси перед DaData может ответить 200 с HTML-страницей: это такой же отказ, как 5xx
+        payload = response.json()
+    except (httpx.HTTPError, ValueError) as e:
+        UPSTREAM_ERRORS.inc()
+        logger.warning("DaData недоступна: %r", e)
+        LOCAL_CACHE.set(key, FAILED, DADATA_FAILURE_TTL)
+        raise SuggestionsUnavailable() from e
+    suggestions = payload.get("suggestions", [])
+    ttl = DADATA_CACHE_TTL if suggestions else DADATA_NEGATIVE_TTL
+    LOCAL_CACHE.set(key, suggestions, ttl)
+    await cache_set_json(key, suggestions, ttl)
+    return suggestions
+
+
+def _forget(key: str, task: asyncio.Task):
+    if _in_flight.get(key) is task:
+        del _in_flight[key]
+    # Ошибку получат ожидающие; если все они отменены, не шуметь в логах
+    if not task.cancelled():
+        task.exception()
+
+
+async def get_address_suggestions(query: str, count: int = DADATA_SUGGESTIONS_COUNT) -> list:
+    """
+    Подсказки из памяти воркера, Redis или DaData (в этом порядке).
+    Бросает SuggestionsUnavailable, если DaData не ответила.
+    """
+    query = normalize_query(query)
+    if not query:
         return []
+    key = cache_key(query, count)
+
+    cached = LOCAL_CACHE.get(key)
+    if cached is FAILED:
+        raise SuggestionsUnavailable()
+    if cached is not None:
+        return cached
+    cached = await cache_get_json(key)
+    if cached is not None:
+        LOCAL_CACHE.set(key, cached, None if cached else DADATA_NEGATIVE_TTL)
+        return cached
+
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.create_task(fetch_address_suggestions(query, count, key))
+        _in_flight[key] = task
+        task.add_done_callback(lambda done: _forget(key, done))
+    else:
+        COALESCED.inc()
+    # shield: отключившийся клиент не отменяет запрос, который ждут другие
+    return await asyncio.shield(task)
+
+
+def get_dadata_stats() -> dict:
+    return {
+        "upstream_requests": UPSTREAM_REQUESTS.value,
+        "upstream_errors": UPSTREAM_ERRORS.value,
+        "coalesced": COALESCED.value,
+        "in_flight": len(_in_flight),
+        "local_cache": LOCAL_CACHE.stats(),
+    }
@@ -0,0 +1,69 @@
+"""
+Версии карточек организаций и ИП для условных GET (ETag / Last-Modified).
+
+Версия карточки — её updated_at плюс время последнего изменения и число
+продуктов и услуг. Её можно получить одним лёгким запросом (агрегаты по
+индексам владельца, без загрузки связей), чтобы ответить 304, или посчитать по
+уже загруженному объекту, когда карточка всё равно отдаётся целиком.
+Удаление продукта/услуги обновляет updated_at владельца (`writes.touch_owners`),
+поэтому Last-Modified его тоже замечает.
+"""
+import hashlib
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .queries import products_table, services_table
+
+
+class DetailVersion(NamedTuple):
+    id: int
+    updated_at: Optional[datetime]
+    services_updated_at: Optional[datetime]
+    services_count: int
+    products_updated_at: Optional[datetime]
+    products_count: int
+
+    @property
+    def etag(self) -> str:
+        raw = "|".join(value.isoformat() if isinstance(value, datetime) else str(value) for value in self)
+        return '"%s"' % hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+    @property
+    def last_modified(self) -> Optional[datetime]:
+        moments = [
+            # SQLite отдаёт время без зоны — это UTC
+            moment.astimezone(timezone.utc) if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+            for moment in (self.updated_at, self.services_updated_at, self.products_updated_at)
+            if moment is not None
+        ]
+        return max(moments, default=None)
+
+
+def _child_aggregate(child_table, owner_field: str, owner_id_column, aggregate):
+    return select(aggregate).where(child_table.c[owner_field] == owner_id_column).scalar_subquery()
+
+
+async def fetch_detail_version(db: AsyncSession, table, owner_field: str, where) -> Optional[DetailVersion]:
+    """Версия карточки одним запросом; None, если карточки нет."""
+    aggregates = []
+    for child_table in (services_table, products_table):
+        aggregates.append(_child_aggregate(child_table, owner_field, table.c.id, func.max(child_table.c.updated_at)))
+        aggregates.append(_child_aggregate(child_table, owner_field, table.c.id, func.count()))
+    result = await db.execute(select(table.c.id, table.c.updated_at, *aggregates).where(where))
+    row = result.first()
+    return DetailVersion(*row) if row is not None else None
+
+
+def loaded_detail_version(obj) -> DetailVersion:
+    """Та же версия по загруженной организации/ИП (services и products уже подгружены)."""
+    return DetailVersion(
+        obj.id,
+        obj.updated_at,
+        max((service.updated_at for service in obj.services), default=None),
+        len(obj.services),
+        max((product.updated_at for product in obj.products), default=None),
+        len(obj.products),
+    )
@@ -0,0 +1,68 @@
+"""
+Запись одним запросом: UPDATE/DELETE ... RETURNING с проверкой владельца прямо в WHERE.
+
+Вместо SELECT -> изменение объекта -> COMMIT -> refresh изменение и проверка прав
+укладываются в один оператор. Если он не затронул ни одной строки, отдельный
+запрос (только на этом, редком, пути) выясняет, чего не хватило: строки (404) или прав (403).
+"""
+from typing import Optional, Sequence
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .queries import entrepreneurs_table, organizations_table
+
+
+def owned_child_filter(table, auth):
+    """
+    Условие владения продуктом/услугой: каждая заполненная привязка
+    (организация, ИП) должна принадлежать пользователю из контекста авторизации.
+    """
+    return and_(
+        or_(table.c.organization_id.is_(None), table.c.organization_id.in_(auth.organization_ids)),
+        or_(
+            table.c.individual_entrepreneur_id.is_(None),
+            table.c.individual_entrepreneur_id == auth.entrepreneur_id,
+        ),
+    )
+
+
+def table_values(table, values: dict) -> dict:
+    """Только те поля, что есть в таблице (схемы обновления бывают шире модели)."""
+    return {key: value for key, value in values.items() if key in table.c}
+
+
+async def update_returning(db: AsyncSession, table, where: Sequence, values: dict, fields: Sequence[str]):
+    """
+    UPDATE ... WHERE ... RETURNING fields; строка (Row) или None, если ничего не обновлено.
+    Без значений для обновления выполняет SELECT с тем же условием.
+    """
+    columns = [table.c[field] for field in fields]
+    if values:
+        statement = update(table).where(*where).values(values).returning(*columns)
+    else:
+        statement = select(*columns).where(*where)
+    result = await db.execute(statement)
+    return result.first()
+
+
+async def delete_returning(db: AsyncSession, table, where: Sequence, fields: Sequence[str] = ("id",)):
+    """DELETE ... WHERE ... RETURNING fields; удалённая строка (Row) или None."""
+    result = await db.execute(delete(table).where(*where).returning(*(table.c[field] for field in fields)))
+    return result.first()
+
+
+async def touch_owners(db: AsyncSession, organization_id: Optional[int], individual_entrepreneur_id: Optional[int]):
+    """
+    Обновляет updated_at организации/ИП, у которых удалили продукт или услугу:
+    иначе Last-Modified карточки владельца не изменился бы.
+    """
+    for table, owner_id in ((organizations_table, organization_id), (entrepreneurs_table, individual_entrepreneur_id)):
+        if owner_id is not None:
+            await db.execute(update(table).where(table.c.id == owner_id).values(updated_at=func.now()))
+
+
+async def fetch_owner_columns(db: AsyncSession, table, row_id: int, fields: Sequence[str]):
+    """Колонки владельца строки, чтобы объяснить неудачную запись (None — строки нет)."""
+    result = await db.execute(select(*(table.c[field] for field in fields)).where(table.c.id == row_id))
+    return result.first()
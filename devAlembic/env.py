@@ -30,11 +30,24 @@ from biznes_vokrug_backend.models import Base
 # Метаданные для Alembic
 target_metadata = [Base.metadata]
 
+# Колонки полнотекстового поиска (и их GIN-индексы) созданы миграцией 34cc8b635513:
+# их заполняет триггер в БД, а в моделях их нет. Без этого фильтра autogenerate
+# предлагал бы удалить колонки и индексы; триггеры и функции он и так не сравнивает.
+SEARCH_VECTOR_COLUMN = "search_vector"
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "column" and name == SEARCH_VECTOR_COLUMN:
+        return False
+    if type_ == "index" and name.endswith(f"_{SEARCH_VECTOR_COLUMN}"):
+        return False
+    return True
+
 def run_migrations_offline():
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -50,7 +63,8 @@ def run_migrations_online():
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
-            target_metadata=target_metadata
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
         with context.begin_transaction():
             context.run_migrations()
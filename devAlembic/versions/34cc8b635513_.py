@@ -0,0 +1,92 @@
+"""russian full-text search vectors
+
+Revision ID: 34cc8b635513
+Revises: 9afb21af26a7
+Create Date: 2026-10-18 11:03:27.540918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '34cc8b635513'
+down_revision: Union[str, None] = '9afb21af26a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ['organizations_models', 'products_models', 'services_models']
+
+# Название важнее описания: вес A против B
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian'::regconfig, coalesce({row}name, '')), 'A') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce({row}description, '')), 'B')"
+)
+# Строк за одну транзакцию при заполнении: короткие блокировки строк, без
+# блокировки всей таблицы
+BACKFILL_BATCH_SIZE = 5000
+
+
+def _function(table: str) -> str:
+    return f'{table}_search_vector_update'
+
+
+def _trigger(table: str) -> str:
+    return f'{table}_search_vector_trigger'
+
+
+def upgrade() -> None:
+    # Генерируемая STORED-колонка переписала бы всю таблицу под ACCESS EXCLUSIVE.
+    # Поэтому колонка обычная и nullable: ADD COLUMN без значения по умолчанию меняет
+    # только каталог. Новые и изменённые строки заполняет триггер, старые — пачками ниже.
+    for table in TABLES:
+        op.add_column(table, sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+        op.execute(f"""
+            CREATE OR REPLACE FUNCTION {_function(table)}() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {SEARCH_VECTOR.format(row='NEW.')};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {_trigger(table)}
+            BEFORE INSERT OR UPDATE OF name, description ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {_function(table)}()
+        """)
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        for table in TABLES:
+            # Каждая пачка — отдельная транзакция; прерванную миграцию можно повторить
+            while True:
+                result = bind.execute(sa.text(f"""
+                    UPDATE {table} SET search_vector = {SEARCH_VECTOR.format(row='')}
+                    WHERE id IN (
+                        SELECT id FROM {table} WHERE search_vector IS NULL
+                        ORDER BY id LIMIT {BACKFILL_BATCH_SIZE}
+                    )
+                """))
+                if result.rowcount == 0:
+                    break
+        for table in TABLES:
+            op.create_index(
+                f'ix_{table}_search_vector', table, ['search_vector'], unique=False,
+                if_not_exists=True, postgresql_using='gin', postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.drop_index(
+                f'ix_{table}_search_vector', table_name=table, if_exists=True, postgresql_concurrently=True
+            )
+    for table in TABLES:
+        op.execute(f'DROP TRIGGER IF EXISTS {_trigger(table)} ON {table}')
+        op.execute(f'DROP FUNCTION IF EXISTS {_function(table)}()')
+        op.drop_column(table, 'search_vector')
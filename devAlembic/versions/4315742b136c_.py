@@ -0,0 +1,35 @@
+"""default updated_at for products and services
+
+Revision ID: 4315742b136c
+Revises: 34cc8b635513
+Create Date: 2026-10-18 11:47:09.264730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '4315742b136c'
+down_revision: Union[str, None] = '34cc8b635513'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # updated_at NOT NULL без значения по умолчанию: INSERT без явного updated_at падал
+    for table in ('products_models', 'services_models'):
+        op.alter_column(table, 'updated_at',
+                   existing_type=postgresql.TIMESTAMP(timezone=True),
+                   existing_nullable=False,
+                   server_default=sa.text('now()'))
+
+
+def downgrade() -> None:
+    for table in ('products_models', 'services_models'):
+        op.alter_column(table, 'updated_at',
+                   existing_type=postgresql.TIMESTAMP(timezone=True),
+                   existing_nullable=False,
+                   server_default=None)
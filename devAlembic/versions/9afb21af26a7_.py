@@ -0,0 +1,49 @@
+"""indexes for foreign-key and filter columns
+
+Revision ID: 9afb21af26a7
+Revises: 96e83561ff00
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9afb21af26a7'
+down_revision: Union[str, None] = '96e83561ff00'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (имя индекса, таблица, колонки) — совпадают с __table_args__ моделей
+INDEXES = [
+    ('ix_organizations_models_owner_id', 'organizations_models', ['owner_id', 'id']),
+    ('ix_organizations_models_created_at_id', 'organizations_models', ['created_at', 'id']),
+    ('ix_individual_entrepreneurs_models_owner_id', 'individual_entrepreneurs_models', ['owner_id', 'id']),
+    ('ix_products_models_organization_id', 'products_models', ['organization_id', 'id']),
+    ('ix_products_models_individual_entrepreneur_id', 'products_models', ['individual_entrepreneur_id', 'id']),
+    ('ix_products_models_category_id', 'products_models', ['category_id']),
+    ('ix_services_models_organization_id', 'services_models', ['organization_id', 'id']),
+    ('ix_services_models_individual_entrepreneur_id', 'services_models', ['individual_entrepreneur_id', 'id']),
+    ('ix_services_models_category_id', 'services_models', ['category_id']),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY не блокирует запись в таблицу, но не может
+    # выполняться внутри транзакции. IF NOT EXISTS позволяет повторить миграцию,
+    # если она прервалась на середине (недостроенный индекс надо удалить вручную).
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False, if_not_exists=True, postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,30 @@
+"""updated_at for individual entrepreneurs
+
+Revision ID: b8e4c1d0a7f2
+Revises: 4315742b136c
+Create Date: 2026-10-18 12:20:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e4c1d0a7f2'
+down_revision: Union[str, None] = '4315742b136c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Нужен для ETag/Last-Modified карточки ИП; существующие строки получают время миграции
+    op.add_column(
+        'individual_entrepreneurs_models',
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('individual_entrepreneurs_models', 'updated_at')
@@ -0,0 +1,63 @@
+"""
+Общие фикстуры тестов: окружение, файловые базы SQLite и клиент приложения.
+
+Модуль, которому нужна база с данными, объявляет `DATABASE = SqliteDatabase("<файл>")`
+и функцию `seed(db)`, заполняющую синхронную сессию; фикстура `client` создаёт
+таблицы, вызывает `seed` и подменяет зависимости get_db/get_read_db этой базой.
+"""
+import os
+
+# До импорта приложения: модули читают окружение при загрузке
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from biznes_vokrug_backend.auth import create_access_token
+from biznes_vokrug_backend.database import Base, get_db, get_read_db
+from biznes_vokrug_backend.main import app
+
+
+class SqliteDatabase:
+    """Тестовая база в файле: синхронный движок для подготовки данных, асинхронный для приложения."""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.engine = create_engine(f"sqlite:///./{filename}", connect_args={"check_same_thread": False})
+        self.Session = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.async_engine = create_async_engine(f"sqlite+aiosqlite:///./{filename}")
+        self.AsyncSession = async_sessionmaker(bind=self.async_engine, expire_on_commit=False)
+
+    async def override_get_db(self):
+        async with self.AsyncSession() as db:
+            yield db
+
+
+@pytest.fixture(scope="module")
+def client(request):
+    database = request.module.DATABASE
+    Base.metadata.create_all(bind=database.engine)
+    with database.Session() as db:
+        request.module.seed(db)
+        db.commit()
+    app.dependency_overrides[get_db] = database.override_get_db
+    app.dependency_overrides[get_read_db] = database.override_get_db
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.pop(get_read_db, None)
+    Base.metadata.drop_all(bind=database.engine)
+    database.engine.dispose()
+    if os.path.exists(database.filename):
+        os.remove(database.filename)
+
+
+@pytest.fixture
+def auth_headers():
+    """Заголовок авторизации пользователя с id=1 (владельца в данных модулей)."""
+    return {"Authorization": f"Bearer {create_access_token({'sub': '1'})}"}
@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import func, select
+from biznes_vokrug_backend.models import IndividualEntrepreneur, Organization, Product, Service, User
+from biznes_vokrug_backend.schemas import BATCH_MAX_ITEMS
+from tests.conftest import SqliteDatabase
+
+DATABASE = SqliteDatabase("test_batch.db")
+
+
+def seed(db):
+    db.add(User(id=1, name="Владелец", email="owner@example.com", hashed_password="x"))
+    db.add(User(id=2, name="Чужой", email="other@example.com", hashed_password="x"))
+    db.add(Organization(id=1, name="Своя", inn="0000000001", ogrn="0000000000001", owner_id=1))
+    db.add(Organization(id=2, name="Чужая", inn="0000000002", ogrn="0000000000002", owner_id=2))
+    db.add(IndividualEntrepreneur(id=1, name="ИП", inn="000000000001", ogrnip="000000000000001", owner_id=1))
+
+
+def count(model) -> int:
+    with DATABASE.Session() as db:
+        return db.scalar(select(func.count()).select_from(model))
+
+
+def test_products_batch_is_created_in_order(client, auth_headers):
+    before = count(Product)
+    items = [
+        {"name": "Первый", "price": 10, "organization_id": 1},
+        {"name": "Второй", "individual_entrepreneur_id": 1},
+        {"name": "Третий", "organization_id": 1},
+    ]
+    response = client.post("/api/products/batch", json={"items": items}, headers=auth_headers)
+    assert response.status_code == 201
+    created = response.json()["data"]
+    assert [product["name"] for product in created] == ["Первый", "Второй", "Третий"]
+    assert created[1]["individual_entrepreneur_id"] == 1
+    assert all(product["id"] for product in created)
+    assert count(Product) == before + 3
+
+
+def test_batch_with_foreign_owner_creates_nothing(client, auth_headers):
+    before = count(Service)
+    items = [
+        {"name": "Своя", "organization_id": 1},
+        {"name": "Чужая", "organization_id": 2},
+        {"name": "Чужой ИП", "individual_entrepreneur_id": 99},
+    ]
+    response = client.post("/api/services/batch", json={"items": items}, headers=auth_headers)
+    assert response.status_code == 403
+    body = response.json()
+    assert body["status"] is False
+    assert [(error["index"], error["field"]) for error in body["errors"]] == [
+        (1, "organization_id"), (2, "individual_entrepreneur_id"),
+    ]
+    # Валидный первый элемент тоже не вставлен: пакет принимается целиком или никак
+    assert count(Service) == before
+
+
+@pytest.mark.parametrize("size", [0, BATCH_MAX_ITEMS + 1])
+def test_batch_size_is_limited(client, auth_headers, size):
+    before = count(Product)
+    items = [{"name": f"Продукт {i}", "organization_id": 1} for i in range(size)]
+    response = client.post("/api/products/batch", json={"items": items}, headers=auth_headers)
+    assert response.status_code == 422
+    assert count(Product) == before
+
+
+def test_anonymous_batch_is_rejected(client):
+    response = client.post("/api/products/batch", json={"items": [{"name": "x", "organization_id": 1}]})
+    assert response.status_code == 401
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from biznes_vokrug_backend.utils import redis_client
+from biznes_vokrug_backend.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def test_breaker_opens_after_consecutive_failures_and_recovers(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("biznes_vokrug_backend.utils.circuit_breaker.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+
+    breaker.record_failure()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.allow() is False
+
+    now[0] = 10
+    assert breaker.allow() is True  # пробный вызов
+    assert breaker.allow() is False  # остальные ждут его результата
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    now[0] = 20
+    assert breaker.allow() is True
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.stats()["opened"] == 2  # второй раз — после неудачной пробы
+
+
+def test_cache_skips_redis_while_breaker_is_open(monkeypatch):
+    calls = []
+
+    async def failing_get(key):
+        calls.append(key)
+        raise ConnectionError("Redis недоступен")
+
+    monkeypatch.setattr(redis_client, "redis_breaker", CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    monkeypatch.setattr(redis_client.redis_client, "get", failing_get)
+
+    async def run():
+        return [await redis_client.cache_get_json(f"key:{i}") for i in range(5)]
+
+    assert asyncio.run(run()) == [None] * 5
+    # после двух ошибок подряд Redis больше не вызывается
+    assert len(calls) == 2
+    assert redis_client.redis_breaker.stats()["short_circuited"] == 3
+
+
+def test_lost_probe_does_not_leave_breaker_half_open(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("biznes_vokrug_backend.utils.circuit_breaker.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+
+    now[0] = 10
+    assert breaker.allow() is True  # проба, результата которой не будет
+    assert breaker.state == HALF_OPEN
+    now[0] = 15
+    assert breaker.allow() is False
+    now[0] = 20
+    assert breaker.allow() is True  # следующая проба
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_cancelled_probe_counts_as_failure(monkeypatch):
+    async def cancelled_get(key):
+        raise asyncio.CancelledError()
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    monkeypatch.setattr(redis_client, "redis_breaker", breaker)
+    monkeypatch.setattr(redis_client.redis_client, "get", cancelled_get)
+
+    async def run():
+        await redis_client.cache_get_json("key")
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(run())
+    assert breaker.state == OPEN
+    assert breaker.stats()["opened"] == 2
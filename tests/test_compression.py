@@ -0,0 +1,89 @@
+import gzip
+
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from biznes_vokrug_backend.middleware import CompressionMiddleware, choose_encoding
+
+ITEMS = [{"id": i, "name": f"Организация {i}", "city": "Москва"} for i in range(500)]
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+
+@app.get("/large")
+async def large():
+    return ORJSONResponse(ITEMS, headers={"ETag": '"v1"'})
+
+
+@app.get("/small")
+async def small():
+    return ORJSONResponse({"status": True})
+
+
+@app.get("/stream")
+async def stream():
+    async def lines():
+        for item in ITEMS:
+            yield f'{item["id"]},{item["name"]}\n'.encode()
+    return StreamingResponse(lines(), media_type="text/csv")
+
+
+@app.get("/not-modified")
+async def not_modified():
+    return Response(status_code=304, headers={"ETag": '"v1"'})
+
+
+@app.get("/image")
+async def image():
+    return Response(b"\x89PNG" + b"\x00" * 4096, media_type="image/png")
+
+
+client = TestClient(app)
+
+
+def test_large_json_is_gzipped():
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    # Байты сжатого тела другие — ETag становится слабым
+    assert response.headers["etag"] == 'W/"v1"'
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json() == ITEMS
+
+
+def test_small_and_precompressed_responses_are_untouched():
+    small_response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small_response.headers
+    image_response = client.get("/image", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in image_response.headers
+
+
+def test_no_compression_without_accept_encoding():
+    response = client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"v1"'
+
+
+def test_not_modified_carries_weak_etag_for_compressing_client():
+    response = client.get("/not-modified", headers={"Accept-Encoding": "gzip", "If-None-Match": 'W/"v1"'})
+    assert response.status_code == 304
+    assert response.headers["etag"] == 'W/"v1"'
+    assert client.get("/not-modified", headers={"Accept-Encoding": "identity"}).headers["etag"] == '"v1"'
+
+
+def test_streaming_response_is_compressed_in_chunks():
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        raw = b"".join(response.iter_raw())
+    expected = "".join(f'{item["id"]},{item["name"]}\n' for item in ITEMS).encode()
+    assert gzip.decompress(raw) == expected
+
+
+def test_accept_encoding_q_values():
+    assert choose_encoding("gzip;q=0, deflate") is None
+    assert choose_encoding("deflate, gzip;q=0.5") == "gzip"
+    assert choose_encoding("*") is not None
+    assert choose_encoding("") is None
@@ -0,0 +1,103 @@
+import asyncio
+
+import httpx
+import pytest
+
+from biznes_vokrug_backend.utils import redis_dadata
+
+
+@pytest.fixture
+def dadata(monkeypatch):
+    """DaData на httpx.MockTransport и Redis, который всегда промахивается."""
+    calls = []
+    redis_reads = []
+    redis_dadata.LOCAL_CACHE.clear()
+
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(0.05)
+        if b"nowhere" in request.content:
+            return httpx.Response(200, json={"suggestions": []})
+        return httpx.Response(200, json={"suggestions": [{"value": "г Москва, ул Тверская"}]})
+
+    async def cache_miss(key):
+        redis_reads.append(key)
+        return None
+
+    async def cache_skip(key, value, ttl):
+        return None
+
+    monkeypatch.setattr(redis_dadata, "cache_get_json", cache_miss)
+    monkeypatch.setattr(redis_dadata, "cache_set_json", cache_skip)
+
+    def use(handler_override=None):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler_override or handler))
+        monkeypatch.setattr(redis_dadata, "_client", client)
+        return calls, redis_reads
+
+    return use
+
+
+def test_concurrent_identical_queries_make_one_upstream_call(dadata):
+    calls, _ = dadata()
+
+    async def run():
+        return await asyncio.gather(*(redis_dadata.get_address_suggestions("Тверская") for _ in range(20)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result == [{"value": "г Москва, ул Тверская"}] for result in results)
+    assert redis_dadata._in_flight == {}
+
+
+def test_upstream_timeout_is_reported_as_unavailable(dadata):
+    async def timeout(request):
+        raise httpx.ReadTimeout("timeout", request=request)
+
+    dadata(timeout)
+    with pytest.raises(redis_dadata.SuggestionsUnavailable):
+        asyncio.run(redis_dadata.get_address_suggestions("Тверская"))
+
+
+def test_normalized_queries_share_worker_cache(dadata):
+    calls, redis_reads = dadata()
+
+    async def run():
+        first = await redis_dadata.get_address_suggestions("Москва,  Тверская ")
+        second = await redis_dadata.get_address_suggestions("москва, тверская")
+        other_count = await redis_dadata.get_address_suggestions("москва, тверская", count=10)
+        return first, second, other_count
+
+    first, second, _ = asyncio.run(run())
+    assert first == second
+    # второй запрос — из памяти воркера, без Redis и DaData; другое count — другой ключ
+    assert len(calls) == 2
+    assert len(redis_reads) == 2
+    assert redis_dadata.normalize_query(" Ёлки\tПалки ") == "елки палки"
+
+
+def test_empty_and_failed_responses_are_cached_briefly(dadata):
+    calls, _ = dadata()
+    assert asyncio.run(redis_dadata.get_address_suggestions("nowhere")) == []
+    assert asyncio.run(redis_dadata.get_address_suggestions("nowhere")) == []
+    assert len(calls) == 1
+
+    async def unavailable(request):
+        calls.append(request)
+        return httpx.Response(502)
+
+    dadata(unavailable)
+    for _ in range(2):
+        with pytest.raises(redis_dadata.SuggestionsUnavailable):
+            asyncio.run(redis_dadata.get_address_suggestions("somewhere"))
+    assert len(calls) == 2
+
+
+def test_non_json_body_is_reported_as_unavailable(dadata):
+    async def html(request):
+        return httpx.Response(200, text="<html>502 Bad Gateway</html>")
+
+    calls, _ = dadata(html)
+    with pytest.raises(redis_dadata.SuggestionsUnavailable):
+        asyncio.run(redis_dadata.get_address_suggestions("Тверская"))
+    assert redis_dadata.LOCAL_CACHE.get(redis_dadata.cache_key("тверская", redis_dadata.DADATA_SUGGESTIONS_COUNT)) is redis_dadata.FAILED
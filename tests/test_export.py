@@ -0,0 +1,66 @@
+import csv
+import io
+import orjson
+import pytest
+from biznes_vokrug_backend.models import Organization, Product, Service, User
+from biznes_vokrug_backend.queries import CHILD_FIELDS, ORGANIZATION_FIELDS
+from biznes_vokrug_backend.routers import export
+from tests.conftest import SqliteDatabase
+
+ORGANIZATIONS = 12
+
+DATABASE = SqliteDatabase("test_export.db")
+
+
+def seed(db):
+    db.add(User(id=1, name="Владелец", email="owner@example.com", hashed_password="x"))
+    for i in range(1, ORGANIZATIONS + 1):
+        db.add(Organization(id=i, name=f"Организация {i}", inn=f"{i:010d}", ogrn=f"{i:013d}", owner_id=1))
+        db.add(Product(name=f"Продукт {i}", organization_id=i))
+        db.add(Service(name=f"Услуга {i}", organization_id=i))
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # Несколько пачек с серверного курсора, чтобы проверить склейку частей
+    monkeypatch.setattr(export, "EXPORT_CHUNK_SIZE", 5)
+    monkeypatch.setattr(export, "read_sessionmaker", lambda: DATABASE.AsyncSession)
+
+
+@pytest.mark.parametrize("url", ["/api/export/organizations.ndjson", "/api/export/products.csv"])
+def test_anonymous_export_is_rejected(client, url):
+    assert client.get(url).status_code == 401
+
+
+def test_organizations_ndjson(client, auth_headers):
+    response = client.get("/api/export/organizations.ndjson", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert 'filename="organizations.ndjson"' in response.headers["content-disposition"]
+    rows = [orjson.loads(line) for line in response.content.splitlines()]
+    assert [row["id"] for row in rows] == list(range(1, ORGANIZATIONS + 1))
+    assert rows[0]["products"][0]["name"] == "Продукт 1"
+    assert rows[0]["services"][0]["name"] == "Услуга 1"
+
+
+@pytest.mark.parametrize(
+    "entity, fields",
+    [("organizations", ORGANIZATION_FIELDS), ("products", CHILD_FIELDS), ("services", CHILD_FIELDS)],
+)
+def test_csv_export(client, auth_headers, entity, fields):
+    response = client.get(f"/api/export/{entity}.csv", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == list(fields)
+    assert len(rows) == ORGANIZATIONS + 1
+
+
+def test_export_rejected_when_all_slots_are_busy(client, auth_headers, monkeypatch):
+    class Busy:
+        def locked(self):
+            return True
+
+    monkeypatch.setattr(export, "_export_slots", Busy())
+    response = client.get("/api/export/services.csv", headers=auth_headers)
+    assert response.status_code == 429
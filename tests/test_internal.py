@@ -0,0 +1,21 @@
+from fastapi.testclient import TestClient
+
+from biznes_vokrug_backend.main import app
+from biznes_vokrug_backend.routers import internal
+
+client = TestClient(app)
+
+
+def test_internal_routes_are_hidden_without_configured_token(monkeypatch):
+    monkeypatch.setattr(internal, "INTERNAL_API_TOKEN", None)
+    assert client.get("/api/internal/pool-stats").status_code == 404
+    assert client.post("/api/internal/categories/reload", headers={"X-Internal-Token": ""}).status_code == 404
+
+
+def test_internal_routes_require_matching_token(monkeypatch):
+    monkeypatch.setattr(internal, "INTERNAL_API_TOKEN", "s3cret")
+    assert client.get("/api/internal/pool-stats").status_code == 403
+    assert client.get("/api/internal/pool-stats", headers={"X-Internal-Token": "wrong"}).status_code == 403
+    response = client.get("/api/internal/pool-stats", headers={"X-Internal-Token": "s3cret"})
+    assert response.status_code == 200
+    assert response.json()["status"] is True
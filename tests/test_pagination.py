@@ -0,0 +1,95 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from biznes_vokrug_backend.models import IndividualEntrepreneur, Organization, User
+from biznes_vokrug_backend.utils.pagination import decode_cursor, encode_cursor
+from tests.conftest import SqliteDatabase
+
+DATABASE = SqliteDatabase("test_pagination.db")
+
+
+def seed(db):
+    db.add(User(id=1, name="Владелец", email="owner@example.com", hashed_password="x"))
+    for i in range(1, 8):
+        # Несколько организаций с одинаковым created_at: порядок внутри добирается по id
+        db.add(Organization(
+            id=i, name=f"Организация {i}", inn=f"{i:010d}", ogrn=f"{i:013d}", owner_id=1,
+            created_at=datetime(2025, 1, 1, i % 3),
+        ))
+        db.add(IndividualEntrepreneur(id=i, name=f"ИП {i}", inn=f"{i:012d}", ogrnip=f"{i:015d}", owner_id=1))
+
+
+def collect_pages(client, url, **params):
+    ids, cursor = [], None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = client.get(url, params=query)
+        assert response.status_code == 200
+        body = response.json()
+        ids.extend(item["id"] for item in body["data"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+def test_cursor_roundtrip():
+    token = encode_cursor("id", [42])
+    assert decode_cursor(token, "id", (Organization.id,)) == [42]
+
+
+def test_cursor_for_other_ordering_is_rejected(client):
+    token = encode_cursor("id", [3])
+    response = client.get("/api/organizations", params={"order_by": "created_at", "cursor": token})
+    assert response.status_code == 400
+
+
+def test_malformed_cursor_is_rejected(client):
+    response = client.get("/api/organizations", params={"cursor": "не-курсор"})
+    assert response.status_code == 400
+
+
+def test_organizations_pages_cover_table_once(client):
+    assert collect_pages(client, "/api/organizations", limit=3) == list(range(1, 8))
+
+
+def test_organizations_pages_by_created_at(client):
+    assert collect_pages(client, "/api/organizations", limit=2, order_by="created_at") == [3, 6, 1, 4, 7, 2, 5]
+
+
+def test_individual_entrepreneurs_pages_cover_table_once(client):
+    assert collect_pages(client, "/api/individual-entrepreneurs", limit=4) == list(range(1, 8))
+
+
+def test_last_page_has_no_next_cursor(client):
+    response = client.get("/api/organizations", params={"limit": 50})
+    assert response.json()["next_cursor"] is None
+    assert len(response.json()["data"]) == 7
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("values", [[{"x": 1}], [[1, 2]], ["abc"], [True], [1.5], [None]])
+def test_cursor_with_wrong_value_type_is_rejected(client, values):
+    response = client.get("/api/organizations", params={"cursor": raw_cursor({"o": "id", "v": values})})
+    assert response.status_code == 400
+    response = client.get("/api/individual-entrepreneurs", params={"cursor": raw_cursor({"o": "id", "v": values})})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("values", [[1, 1], ["not-a-date", 1], [{"x": 1}, 1], ["2025-01-01T00:00:00", "1"]])
+def test_created_at_cursor_with_wrong_value_type_is_rejected(client, values):
+    response = client.get(
+        "/api/organizations",
+        params={"order_by": "created_at", "cursor": raw_cursor({"o": "created_at", "v": values})},
+    )
+    assert response.status_code == 400
+
+
+def test_cursor_with_non_list_values_is_rejected():
+    with pytest.raises(HTTPException):
+        decode_cursor(raw_cursor({"o": "id", "v": "1"}), "id", (Organization.id,))
@@ -0,0 +1,52 @@
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from fastapi import HTTPException
+from passlib.hash import bcrypt
+
+from biznes_vokrug_backend.utils import passwords
+
+
+def test_new_hashes_use_argon2():
+    hashed = asyncio.run(passwords.hash_password("secret"))
+    assert hashed.startswith("$argon2")
+    assert asyncio.run(passwords.verify_password("secret", hashed))
+    assert not asyncio.run(passwords.verify_password("wrong", hashed))
+
+
+def test_legacy_bcrypt_hash_is_upgraded_on_verify():
+    legacy = bcrypt.hash("secret")
+    valid, new_hash = asyncio.run(passwords.verify_and_update_password("secret", legacy))
+    assert valid
+    assert new_hash.startswith("$argon2")
+    assert asyncio.run(passwords.verify_and_update_password("wrong", legacy)) == (False, None)
+
+
+def test_saturated_pool_rejects_immediately(monkeypatch):
+    monkeypatch.setattr(passwords, "_in_flight", passwords.PASSWORD_HASH_WORKERS + passwords.PASSWORD_HASH_QUEUE)
+    rejected = passwords.HASH_REJECTED.value
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(passwords.hash_password("secret"))
+    assert error.value.status_code == 503
+    assert passwords.HASH_REJECTED.value == rejected + 1
+
+
+def _exit_worker(password):
+    os._exit(1)
+
+
+def test_broken_pool_is_recreated():
+    restarts = passwords.HASH_POOL_RESTARTS.value
+
+    async def run():
+        # Дочерний процесс умирает — пул ломается; следующий хэш идёт уже в новом пуле
+        with pytest.raises(BrokenProcessPool):
+            await asyncio.get_running_loop().run_in_executor(passwords.hash_executor(), _exit_worker, "secret")
+        return await passwords.hash_password("secret")
+
+    assert asyncio.run(run()).startswith("$argon2")
+    assert passwords.HASH_POOL_RESTARTS.value == restarts + 1
+    passwords.shutdown_hash_executor()
+    assert passwords._executor is None
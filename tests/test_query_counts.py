@@ -0,0 +1,303 @@
+import asyncio
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+from biznes_vokrug_backend.auth import PRINCIPALS, create_access_token
+from biznes_vokrug_backend import detail_cache
+from biznes_vokrug_backend.utils import redis_client
+from biznes_vokrug_backend.utils.circuit_breaker import CircuitBreaker
+from biznes_vokrug_backend.categories import load_categories
+from biznes_vokrug_backend.schemas import ORGANIZATION_DETAIL, dump_envelope
+from biznes_vokrug_backend.models import (
+    IndividualEntrepreneur, Organization, Product, ProductCategory, Service, ServiceCategory, User,
+)
+from tests.conftest import SqliteDatabase
+
+ORGANIZATIONS = 20
+
+DATABASE = SqliteDatabase("test_query_counts.db")
+
+statements = []
+
+
+@event.listens_for(DATABASE.async_engine.sync_engine, "before_cursor_execute")
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    statements.append(statement)
+
+
+def seed(db):
+    now = datetime.now(timezone.utc)
+    db.add(User(id=1, name="Владелец", email="owner@example.com", hashed_password="x"))
+    db.add(ServiceCategory(id=1, name="Образование"))
+    db.add(ProductCategory(id=1, name="Электроника"))
+    db.add(IndividualEntrepreneur(id=1, name="ИП", inn="123456789012", ogrnip="123456789012345", owner_id=1))
+    for i in range(1, ORGANIZATIONS + 1):
+        db.add(Organization(id=i, name=f"Организация {i}", inn=f"{i:010d}", ogrn=f"{i:013d}", owner_id=1))
+        for j in range(2):
+            db.add(Product(name=f"Продукт {i}.{j}", organization_id=i, updated_at=now))
+            db.add(Service(name=f"Услуга {i}.{j}", organization_id=i, updated_at=now))
+    db.add(Product(name="Продукт ИП", individual_entrepreneur_id=1, updated_at=now))
+    db.add(Service(name="Услуга ИП", individual_entrepreneur_id=1, updated_at=now))
+
+
+@pytest.fixture(autouse=True)
+def cold_principal_cache():
+    # Каждый тест начинает с пустым кэшем пользователей, иначе число запросов зависит от порядка
+    PRINCIPALS.clear()
+
+
+def get_counting(client, url, **kwargs):
+    statements.clear()
+    response = client.get(url, **kwargs)
+    assert response.status_code == 200
+    return response.json(), len(statements)
+
+
+def test_organization_list_loads_children_in_bulk(client):
+    body, queries = get_counting(client, "/api/organizations", params={"limit": ORGANIZATIONS})
+    assert len(body["data"]) == ORGANIZATIONS
+    assert all(len(org["products"]) == 2 and len(org["services"]) == 2 for org in body["data"])
+    # организации + одна выборка услуг + одна выборка продуктов
+    assert queries == 3
+
+
+def test_organization_detail_query_count(client):
+    body, queries = get_counting(client, "/api/organization/1")
+    assert len(body["data"]["services"]) == 2
+    assert queries == 3
+
+
+def test_detail_and_list_write_timestamps_alike(client):
+    listed = next(org for org in client.get("/api/organizations", params={"limit": 3}).json()["data"] if org["id"] == 2)
+    detail = client.get("/api/organization/2").json()["data"]
+    assert detail["created_at"] == listed["created_at"]
+    assert detail["products"][0]["updated_at"] == listed["products"][0]["updated_at"]
+
+    # Время с зоной (PostgreSQL): тот же `+00:00`, что у isoformat() и orjson, а не `Z`
+    moment = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    org = Organization(
+        id=1, name="Организация", inn="0000000001", ogrn="0000000000001", owner_id=1, is_verified=False,
+        created_at=moment, updated_at=moment, services=[], products=[],
+    )
+    body = orjson.loads(dump_envelope(ORGANIZATION_DETAIL, org))
+    assert body["data"]["created_at"] == moment.isoformat() == orjson.loads(orjson.dumps(moment))
+
+
+def test_organizations_me_query_count(client):
+    token = create_access_token({"sub": "1"})
+    body, queries = get_counting(
+        client, "/api/organizations/me", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert len(body["data"]) == ORGANIZATIONS
+    # пользователь из токена + организации + услуги + продукты
+    assert queries == 4
+
+
+def test_individual_entrepreneur_list_query_count(client):
+    body, queries = get_counting(client, "/api/individual-entrepreneurs")
+    assert body["data"][0]["products"][0]["name"] == "Продукт ИП"
+    assert queries == 3
+
+
+def test_unloaded_relationship_is_not_lazy_loaded(client):
+    with DATABASE.Session() as db:
+        org = db.get(Organization, 1)
+        with pytest.raises(InvalidRequestError):
+            org.to_dict()
+
+
+def test_ownership_check_uses_cached_auth_context(client, monkeypatch):
+    from biznes_vokrug_backend import auth
+
+    redis = MemoryRedis()
+    monkeypatch.setattr(auth, "redis_client", redis)
+    monkeypatch.setattr(redis_client, "redis_breaker", CircuitBreaker(5, 10))
+    token = create_access_token({"sub": "1"})
+    headers = {"Authorization": f"Bearer {token}"}
+    url = "/api/category-products/organization/products"
+    # промах кэша: пользователь + ID организаций/ИП одним запросом + продукты
+    body, queries = get_counting(client, url, params={"organization_id": 1}, headers=headers)
+    assert len(body) == 2
+    assert queries == 3
+
+    # пользователь уже в кэше процесса, ID владения — в Redis: остаётся только выборка продуктов
+    assert redis.data[auth.auth_context_key(1)]
+    body, queries = get_counting(client, url, params={"organization_id": 2}, headers=headers)
+    assert len(body) == 2
+    assert queries == 1
+    statements.clear()
+    response = client.get(url, params={"organization_id": ORGANIZATIONS + 1}, headers=headers)
+    assert response.status_code == 403
+    assert len(statements) == 0
+
+
+def test_auth_context_read_before_write_is_not_cached(monkeypatch):
+    from biznes_vokrug_backend import auth
+
+    redis = MemoryRedis()
+    monkeypatch.setattr(auth, "redis_client", redis)
+    monkeypatch.setattr(redis_client, "redis_breaker", CircuitBreaker(5, 10))
+    user = auth.Principal(id=1, name=None, email="owner@example.com", phone=None)
+    key = auth.auth_context_key(1)
+
+    async def stale_owned_ids(db, user_id):
+        # Пока запрос читал владение из БД, пользователь создал организацию
+        await auth.invalidate_auth_context(user_id)
+        return {"organizations": [1], "entrepreneur": None}
+
+    monkeypatch.setattr(auth, "load_owned_ids", stale_owned_ids)
+    context = asyncio.run(auth.get_auth_context(user, db=None))
+    assert context.organization_ids == {1}
+    # Устаревший набор не лёг поверх «надгробия»; пока оно живо, набор читается из БД
+    assert redis.data[key] == detail_cache.TOMBSTONE
+    asyncio.run(auth.get_auth_context(user, db=None))
+    assert redis.data[key] == detail_cache.TOMBSTONE
+
+
+def test_delete_checks_ownership_in_one_statement(client):
+    with DATABASE.Session() as db:
+        db.add(User(id=2, name="Другой", email="other@example.com", hashed_password="x"))
+        db.add(Organization(id=100, name="Чужая", inn="9999999999", ogrn="9999999999999", owner_id=2))
+        db.add(Product(id=1000, name="Чужой продукт", organization_id=100, updated_at=datetime.now(timezone.utc)))
+        own_id = db.query(Product.id).filter(Product.organization_id == ORGANIZATIONS).first().id
+        db.commit()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1'})}"}
+
+    statements.clear()
+    response = client.delete(f"/api/products/{own_id}", headers=headers)
+    assert response.status_code == 200
+    # пользователь + ID организаций/ИП + DELETE ... RETURNING + updated_at организации
+    assert len(statements) == 4
+
+    assert client.delete("/api/products/1000", headers=headers).status_code == 403
+    assert client.delete("/api/products/999999", headers=headers).status_code == 404
+    with DATABASE.Session() as db:
+        assert db.get(Product, 1000) is not None
+        assert db.get(Product, own_id) is None
+
+
+def test_principal_is_cached_between_requests(client):
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1'})}"}
+    _, cold = get_counting(client, "/api/organizations/me", headers=headers)
+    _, warm = get_counting(client, "/api/organizations/me", headers=headers)
+    assert warm == cold - 1
+
+    # После изменения профиля пользователь перечитывается из БД
+    response = client.put("/api/user/update", json={"name": "Новое имя"}, headers=headers)
+    assert response.json()["data"]["name"] == "Новое имя"
+    assert PRINCIPALS.get(1) is None
+
+
+def test_category_dropdown_is_served_without_queries(client):
+    asyncio.run(load_categories(DATABASE.AsyncSession))
+
+    body, queries = get_counting(client, "/api/category-products/service-categories-dropdown")
+    assert body == [{"key": 1, "value": "Образование"}]
+    assert queries == 0
+
+    statements.clear()
+    first = client.get("/api/category-products/product-categories-dropdown")
+    assert first.json() == [{"key": 1, "value": "Электроника"}]
+    assert "max-age" in first.headers["cache-control"]
+    repeated = client.get(
+        "/api/category-products/product-categories-dropdown",
+        headers={"If-None-Match": first.headers["etag"]},
+    )
+    assert repeated.status_code == 304
+    assert repeated.content == b""
+    assert statements == []
+
+
+def test_organization_detail_revalidates_with_one_query(client):
+    first = client.get("/api/organization/2")
+    etag, last_modified = first.headers["etag"], first.headers["last-modified"]
+
+    statements.clear()
+    repeated = client.get("/api/organization/2", headers={"If-None-Match": etag})
+    assert repeated.status_code == 304
+    assert repeated.headers["etag"] == etag
+    # только версия карточки, без организации, продуктов и услуг
+    assert len(statements) == 1
+
+    by_date = client.get("/api/organization/2", headers={"If-Modified-Since": last_modified})
+    assert by_date.status_code == 304
+
+    with DATABASE.Session() as db:
+        db.add(Product(name="Новый продукт", organization_id=2, updated_at=datetime.now(timezone.utc)))
+        db.commit()
+    changed = client.get("/api/organization/2", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()["data"]["products"]) == 3
+
+
+def test_entrepreneur_detail_etag_matches_version_lookup(client):
+    first = client.get("/api/individual-entrepreneurs/1")
+    assert first.status_code == 200
+    repeated = client.get("/api/individual-entrepreneurs/1", headers={"If-None-Match": first.headers["etag"]})
+    assert repeated.status_code == 304
+
+
+class MemoryRedis:
+    """Минимальная замена Redis для кэша карточек: get/set и конвейер."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    def pipeline(self, transaction=True):
+        return MemoryPipeline(self)
+
+
+class MemoryPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+
+    async def execute(self):
+        return [await self.redis.set(*args, **kwargs) for args, kwargs in self.calls]
+
+
+def test_cached_detail_is_served_without_queries(client, monkeypatch):
+    redis = MemoryRedis()
+    monkeypatch.setattr(detail_cache, "redis_client", redis)
+    # Предыдущие тесты шли без Redis и могли разомкнуть предохранитель
+    monkeypatch.setattr(redis_client, "redis_breaker", CircuitBreaker(5, 10))
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1'})}"}
+
+    first = client.get("/api/organization/3")
+    assert first.status_code == 200
+    statements.clear()
+    cached = client.get("/api/organization/3")
+    by_ogrn = client.get(f"/api/organizations/by_ogrn/{3:013d}")
+    not_modified = client.get("/api/organization/3", headers={"If-None-Match": first.headers["etag"]})
+    assert statements == []
+    assert cached.content == first.content == by_ogrn.content
+    assert not_modified.status_code == 304
+
+    # Новый продукт сбрасывает карточку: следующий запрос идёт в БД и видит его
+    created = client.post("/api/products/", json={"name": "Свежий", "organization_id": 3}, headers=headers)
+    assert created.status_code == 201
+    assert redis.data[detail_cache.detail_key(detail_cache.ORGANIZATION, 3)] == detail_cache.TOMBSTONE
+    fresh = client.get("/api/organization/3")
+    assert len(fresh.json()["data"]["products"]) == 3
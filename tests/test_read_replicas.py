@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from biznes_vokrug_backend import database
+from biznes_vokrug_backend.auth import create_access_token
+from biznes_vokrug_backend.middleware import ReadYourWritesMiddleware
+from biznes_vokrug_backend.utils.lru import TTLCache
+
+
+def test_reads_go_to_primary_without_replicas():
+    assert database.read_sessionmaker() is database.AsyncSessionLocal
+
+
+def test_replicas_are_used_round_robin(monkeypatch):
+    replicas = [object(), object()]
+    monkeypatch.setattr(database, "ReplicaSessionLocals", replicas)
+    monkeypatch.setattr(database, "_replica_cycle", iter(replicas * 2))
+    assert [database.read_sessionmaker() for _ in range(3)] == [replicas[0], replicas[1], replicas[0]]
+    assert database.read_sessionmaker(prefer_primary=True) is database.AsyncSessionLocal
+
+
+@pytest.fixture
+def writers(monkeypatch):
+    """Отметки записи только в памяти: Redis всегда промахивается."""
+    monkeypatch.setattr(database, "RECENT_WRITERS", TTLCache(maxsize=100, ttl=60))
+    redis_keys = []
+
+    async def redis_miss(description, func, *args, default=None, **kwargs):
+        redis_keys.append(args[0])
+        return default
+
+    monkeypatch.setattr(database, "redis_call", redis_miss)
+    return redis_keys
+
+
+def test_wrote_recently_is_per_user(writers):
+    async def run():
+        await database.mark_write(1, window_seconds=5)
+        return await database.wrote_recently(1), await database.wrote_recently(2), await database.wrote_recently(None)
+
+    assert asyncio.run(run()) == (True, False, False)
+    # отметка ушла в Redis для других воркеров; аноним Redis не спрашивает
+    assert writers == [database.last_write_key(1), database.last_write_key(2)]
+
+
+def test_middleware_marks_only_authenticated_successful_writes(writers):
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, window_seconds=3)
+
+    @app.get("/item")
+    async def read_item(request: Request):
+        return {"user_id": getattr(request.state, "user_id", None)}
+
+    @app.post("/item")
+    async def write_item():
+        return {"ok": True}
+
+    @app.delete("/item")
+    async def fail_item():
+        return JSONResponse(status_code=403, content={"ok": False})
+
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '7'})}"}
+    assert client.get("/item", headers=headers).json() == {"user_id": 7}
+    assert client.get("/item", headers={"Authorization": "Bearer garbage"}).json() == {"user_id": None}
+
+    client.post("/item")
+    client.delete("/item", headers=headers)
+    assert database.RECENT_WRITERS.get(7) is None
+    assert "set-cookie" not in client.post("/item", headers=headers).headers
+    assert database.RECENT_WRITERS.get(7) is True
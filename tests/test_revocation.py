@@ -0,0 +1,41 @@
+import asyncio
+
+from redis.exceptions import ConnectionError
+
+from biznes_vokrug_backend import revocation
+from biznes_vokrug_backend.utils.bloom import BloomFilter
+
+
+class UnavailableRedis:
+    calls = 0
+
+    async def exists(self, key):
+        self.calls += 1
+        raise ConnectionError("Redis недоступен")
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [f"jti-{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+    assert all(item in bloom for item in items)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_unrevoked_token_is_checked_without_redis(monkeypatch):
+    redis = UnavailableRedis()
+    monkeypatch.setattr(revocation, "redis_client", redis)
+    monkeypatch.setattr(revocation, "_bloom", BloomFilter(1000))
+    assert asyncio.run(revocation.is_revoked("fresh-jti")) is False
+    assert redis.calls == 0
+
+
+def test_bloom_hit_fails_closed_when_redis_is_down(monkeypatch):
+    redis = UnavailableRedis()
+    monkeypatch.setattr(revocation, "redis_client", redis)
+    monkeypatch.setattr(revocation, "_bloom", BloomFilter(1000))
+    revocation._remember("revoked-jti")
+    assert asyncio.run(revocation.is_revoked("revoked-jti")) is True
+    assert redis.calls == 1
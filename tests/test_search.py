@@ -0,0 +1,97 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from biznes_vokrug_backend.main import app
+from biznes_vokrug_backend.database import get_read_db
+from biznes_vokrug_backend.search import SEARCH_KINDS, search_statement
+
+
+def compile_pg(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_search_statement_compiles_for_postgres():
+    sql = compile_pg(search_statement("ремонт обуви", SEARCH_KINDS, 20, 40))
+    assert sql.count("UNION ALL") == len(SEARCH_KINDS) - 1
+    assert sql.count("websearch_to_tsquery('russian'::regconfig, 'ремонт обуви')") == 2 * len(SEARCH_KINDS)
+    assert "organizations_models.search_vector @@ websearch_to_tsquery" in sql
+    assert "ts_rank_cd(products_models.search_vector" in sql
+    # Сначала самые релевантные, при равенстве — стабильный порядок
+    assert "ORDER BY results.rank DESC, results.kind, results.id" in sql
+    assert "LIMIT 21 OFFSET 40" in sql
+
+
+def test_search_statement_only_selected_kinds():
+    sql = compile_pg(search_statement("ремонт", ["service"], 10, 0))
+    assert "UNION ALL" not in sql
+    assert "services_models" in sql
+    assert "organizations_models" not in sql and "products_models" not in sql
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Вместо PostgreSQL: запоминает запрос и отдаёт заранее заданные строки."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.rows)
+
+
+@pytest.fixture
+def search_db():
+    def use(rows):
+        session = FakeSession(rows)
+
+        async def override():
+            yield session
+
+        app.dependency_overrides[get_read_db] = override
+        return session
+
+    yield use
+    app.dependency_overrides.pop(get_read_db, None)
+
+
+def row(i: int, kind: str = "product") -> dict:
+    return {
+        "kind": kind, "id": i, "name": f"Позиция {i}", "description": None,
+        "organization_id": 1, "individual_entrepreneur_id": None, "rank": 1.0 / i,
+    }
+
+
+def test_search_pages_by_offset(search_db):
+    session = search_db([row(i) for i in range(1, 4)])
+    response = TestClient(app).get("/api/search", params={"q": "позиция", "kind": ["product"], "limit": 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["id"] for item in body["data"]] == [1, 2]
+    assert body["next_offset"] == 2
+    assert "UNION ALL" not in compile_pg(session.statements[0])
+
+
+def test_search_last_page(search_db):
+    search_db([row(1, "organization")])
+    body = TestClient(app).get("/api/search", params={"q": "позиция"}).json()
+    assert body["next_offset"] is None
+    assert body["data"][0]["kind"] == "organization"
+
+
+@pytest.mark.parametrize("params", [{"q": "я"}, {"q": "позиция", "kind": "people"}, {"q": "позиция", "offset": 5000}])
+def test_search_rejects_bad_parameters(search_db, params):
+    search_db([])
+    assert TestClient(app).get("/api/search", params=params).status_code == 422
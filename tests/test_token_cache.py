@@ -0,0 +1,44 @@
+import time
+from datetime import timedelta
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from biznes_vokrug_backend import auth
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    auth.VERIFIED_TOKENS.clear()
+
+
+def test_repeated_token_is_decoded_once(monkeypatch):
+    token = auth.create_access_token({"sub": "1"})
+    decode_calls = []
+    real_decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        decode_calls.append(1)
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth.jwt, "decode", counting_decode)
+    hits = auth.VERIFIED_TOKENS.hits.value
+    for _ in range(5):
+        assert auth.verify_token(token)["sub"] == "1"
+    assert len(decode_calls) == 1
+    assert auth.VERIFIED_TOKENS.hits.value == hits + 4
+
+
+def test_cached_entry_does_not_outlive_token(monkeypatch):
+    token = auth.create_access_token({"sub": "1"}, expires_delta=timedelta(seconds=1))
+    auth.verify_token(token)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 2)
+    assert auth.VERIFIED_TOKENS.get(auth.hashlib.sha256(token.encode()).digest()) is None
+
+
+def test_invalid_tokens_are_not_cached():
+    with pytest.raises(HTTPException):
+        auth.verify_token("not-a-token")
+    assert auth.VERIFIED_TOKENS.stats()["size"] == 0